@@ -1,16 +1,210 @@
-from fastapi import FastAPI, Query
-from fastapi.responses import JSONResponse
+from fastapi import Depends, FastAPI, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from functools import lru_cache
-from datetime import date
+from contextlib import asynccontextmanager
+import asyncio
+from datetime import date, timedelta
+import os
 import uvicorn
 
 # Import the scraping functions
-from scraper_scores import scrape_scores_all
-from scraper_predictions import scrape_predictions_all
-from scraper_fixtures import scrape_fixtures_all
+from scraper_scores import scrape_scores_source, list_score_sources, scrape_scores_range, score_range_key, \
+    SEASON_MAX_AGE
+from scraper_predictions import scrape_predictions_source, list_prediction_sources
+from scraper_fixtures import scrape_fixtures_source, list_fixture_sources, scrape_fixtures_range, \
+    list_fixture_range_sources
+from scheduler import RefreshScheduler
+from store import SnapshotStore
+from fetcher import response_cache_stats, host_health_stats
+from records import Match, Fixture, Prediction, JoinedMatch, parse_date, project
+from views import ViewCache
+from responses import encoded_response, ndjson_response, encode_cursor, decode_cursor
+from live import Broadcaster, score_diff_listener
+from model import TeamStrengthModel
+from entities import resolver
+from matches import MatchIndex
+import metrics
+from profiling import ProfileRequestMiddleware, profile_mode
 
-app = FastAPI()
+# Background refresh intervals (seconds) per dataset
+SCORES_REFRESH_INTERVAL = 60
+# Soccer scores come from whole-season pages that change a few times a day;
+# every soccer key (dates and the season range) shares one fetch per interval
+SOCCER_SCORES_REFRESH_INTERVAL = SEASON_MAX_AGE
+PREDICTIONS_REFRESH_INTERVAL = 15 * 60
+FIXTURES_REFRESH_INTERVAL = 30 * 60
+
+# Seconds a request waits for a cold key's first scrape before answering 504;
+# the scrape keeps running and the next request is served from cache
+REQUEST_TIMEOUT = 15
+
+# Results for past dates are final: never revalidated, kept for a day
+FINISHED_SCORES_TTL = 24 * 60 * 60
+
+def is_finished_date(date_str):
+    try:
+        return date.fromisoformat(date_str) < date.today()
+    except (TypeError, ValueError):
+        return False
+
+# Scores and fixtures are cached per (sport, league) source, so a request for
+# one league only ever scrapes that league
+def scores_refresh_interval(sport, league, date_str=None):
+    if is_finished_date(date_str):
+        return None
+    return SOCCER_SCORES_REFRESH_INTERVAL if sport == "Soccer" else SCORES_REFRESH_INTERVAL
+
+def scores_ttl(sport, league, date_str=None):
+    if is_finished_date(date_str):
+        return FINISHED_SCORES_TTL
+    return 10 * scores_refresh_interval(sport, league, date_str)
+
+def default_score_keys():
+    today = date.today().isoformat()
+    return [(sport, league, today) for sport, league in list_score_sources()]
+
+# Date ranges are cached per source as (sport, league, start, end); soccer
+# uses one whole-season key per league (see score_range_key)
+# The prediction model learns from whole soccer seasons and, for MLB and NHL,
+# the current calendar month and the MODEL_HISTORY_MONTHS before it. Each
+# month is one fixed range key: scraped while it's current, then final and
+# never revalidated, so the keys don't roll over daily.
+MODEL_HISTORY_MONTHS = 3
+# A range running past today changes only as its games finish, and today's
+# games are refreshed through the "scores" keys
+OPEN_RANGE_REFRESH_INTERVAL = 60 * 60
+
+def model_months(today=None):
+    # [(first day, last day)] of the months the model learns from
+    first = (today or date.today()).replace(day=1)
+    months = []
+    for _ in range(MODEL_HISTORY_MONTHS + 1):
+        months.append((first, (first + timedelta(days=31)).replace(day=1) - timedelta(days=1)))
+        first = (first - timedelta(days=1)).replace(day=1)
+    return months
+
+def default_score_range_keys():
+    return list(dict.fromkeys(score_range_key(s, l, start, end)
+                              for s, l in list_score_sources() for start, end in model_months()))
+
+def load_score_range(sport, league, start=None, end=None):
+    return scrape_scores_range(sport, league, parse_date(start), parse_date(end))
+
+def score_range_interval(sport, league, start=None, end=None):
+    end_date = parse_date(end)
+    if end_date is not None and end_date > date.today():
+        return OPEN_RANGE_REFRESH_INTERVAL
+    return scores_refresh_interval(sport, league, end)
+
+def score_range_ttl(sport, league, start=None, end=None):
+    if is_finished_date(end):
+        return FINISHED_SCORES_TTL
+    return 10 * score_range_interval(sport, league, start, end)
+
+# Predictions are cached per sport, so one odds site being down only keeps
+# that sport's last good snapshot
+def default_prediction_keys():
+    return [(sport,) for sport in list_prediction_sources()]
+
+def default_fixture_keys():
+    return [(sport, league, 7) for sport, league in list_fixture_sources()]
+
+# Fixtures for a single date, on demand; past dates are never revalidated
+def load_fixture_day(sport, league, date_str):
+    day = parse_date(date_str)
+    return scrape_fixtures_range(sport, league, day, day)
+
+def fixture_day_interval(sport, league, date_str):
+    return None if is_finished_date(date_str) else FIXTURES_REFRESH_INTERVAL
+
+scheduler = RefreshScheduler(store=SnapshotStore())
+resolver.use_database(scheduler.store.path)
+scheduler.register("scores", scrape_scores_source, scores_refresh_interval,
+                   defaults=default_score_keys, ttl=scores_ttl, maxsize=256, decode=Match.from_dict)
+scheduler.register("score_ranges", load_score_range, score_range_interval, defaults=default_score_range_keys,
+                   ttl=score_range_ttl, maxsize=128, decode=Match.from_dict)
+scheduler.register("predictions", scrape_predictions_source, PREDICTIONS_REFRESH_INTERVAL,
+                   defaults=default_prediction_keys, maxsize=8, decode=Prediction.from_dict)
+scheduler.register("fixtures", scrape_fixtures_source, FIXTURES_REFRESH_INTERVAL,
+                   defaults=default_fixture_keys, maxsize=256, decode=Fixture.from_dict)
+scheduler.register("fixture_days", load_fixture_day, fixture_day_interval, defaults=(), maxsize=256,
+                   decode=Fixture.from_dict)
+
+# Indexed, presorted views over the snapshots above; rebuilt only when a
+# snapshot is replaced
+views = ViewCache()
+
+async def cached_view(key, parts):
+    # Rebuilding a view normalizes every record, so it runs off the event loop
+    view = views.peek(key, parts)
+    return view if view is not None else await run_in_threadpool(views.build, key, parts)
+
+# Live score diffs pushed to /scores/live after every scores re-scrape
+broadcaster = Broadcaster()
+scheduler.add_listener(score_diff_listener(broadcaster))
+
+# Team strengths learned from every scores and score range snapshot,
+# predicting the coming week's fixtures next to the scraped odds
+strength_model = TeamStrengthModel()
+scheduler.add_listener(strength_model.listener)
+
+def seed_strength_model():
+    # The stored results of the model's window (today's scores, the soccer
+    # seasons and the model months) in one batch; older backfills aren't read
+    if scheduler.store is None or not strength_model.available():
+        return
+    try:
+        rows = scheduler.store.load_latest("scores", default_score_keys()) + \
+            scheduler.store.load_latest("score_ranges", default_score_range_keys())
+    except Exception as e:
+        print(f"Error loading scores for the prediction model: {e}")
+        return
+    strength_model.update([Match.from_dict(item) for _, _, data in rows for item in data])
+
+# Gauges for /metrics, read from the same stats /cache/stats reports
+def all_cache_stats():
+    caches = scheduler.stats()
+    caches["views"] = views.stats()
+    caches["http"] = response_cache_stats()
+    return caches
+
+def cache_gauge(field, caches=all_cache_stats):
+    return lambda: {(name,): stats.get(field) for name, stats in caches().items()}
+
+metrics.GaugeCallback("mksports_cache_entries", "Entries held per cache", ["cache"], cache_gauge("size"))
+metrics.GaugeCallback("mksports_cache_hits", "Cache hits since start", ["cache"], cache_gauge("hits"))
+metrics.GaugeCallback("mksports_cache_misses", "Cache misses since start", ["cache"], cache_gauge("misses"))
+metrics.GaugeCallback("mksports_cache_hit_ratio", "Cache hit ratio since start", ["cache"], cache_gauge("hit_rate"))
+metrics.GaugeCallback("mksports_snapshot_records", "Records held across a dataset's snapshots", ["dataset"],
+                      cache_gauge("records", scheduler.stats))
+metrics.GaugeCallback("mksports_snapshot_oldest_age_seconds", "Age of a dataset's oldest snapshot", ["dataset"],
+                      cache_gauge("oldest_age", scheduler.stats))
+metrics.GaugeCallback("mksports_refresh_inflight", "Scrapes currently running per dataset", ["dataset"],
+                      cache_gauge("inflight", scheduler.stats))
+metrics.GaugeCallback("mksports_host_circuit_open", "1 while a host's circuit breaker is open or probing", ["host"],
+                      lambda: {(host,): int(s["state"] != "closed") for host, s in host_health_stats().items()})
+metrics.GaugeCallback("mksports_refresh_leader", "1 if this worker does the scraping for all workers", [],
+                      lambda: {(): int(scheduler.is_leader)})
+metrics.GaugeCallback("mksports_live_subscribers", "Connected /scores/live clients", [],
+                      lambda: {(): broadcaster.stats()["subscribers"]})
+
+@asynccontextmanager
+async def lifespan(app):
+    seed_strength_model()
+    scheduler.start()
+    yield
+    scheduler.stop()
+
+app = FastAPI(lifespan=lifespan)
+
+# Handlers are async and never block the event loop: cached snapshots and
+# views are served on it, store lookups, view rebuilds and predictions run on
+# worker threads, and cold keys await the scheduler's bounded scrape pool, so
+# a slow upstream only holds up the requests that need it
+@app.exception_handler(asyncio.TimeoutError)
+async def upstream_timeout(request: Request, exc: asyncio.TimeoutError):
+    return JSONResponse(status_code=504, content={"error": "Upstream sources are slow; retry shortly"})
 
 # Add CORS middleware to allow frontend requests
 app.add_middleware(
@@ -19,130 +213,347 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
+app.add_middleware(metrics.RequestMetricsMiddleware)
+if profile_mode():
+    app.add_middleware(ProfileRequestMiddleware)
+
+# List endpoints take ?limit=&cursor= paging, ?fields= projection and
+# ?format=ndjson streaming; with none of them they return the full array
+MAX_PAGE_SIZE = 1000
+
+class Page:
+    def __init__(self, limit=None, cursor=None, fields=None, format="json"):
+        self.limit = limit
+        self.cursor = cursor
+        self.fields = tuple(f.strip() for f in fields.split(",") if f.strip()) if fields else None
+        self.format = format
+
+# An async dependency, so parsing it doesn't take a threadpool hop
+async def page_params(limit: int = Query(None, ge=1, le=MAX_PAGE_SIZE), cursor: str = None,
+                      fields: str = None, format: str = Query("json", pattern="^(json|ndjson)$")):
+    return Page(limit, cursor, fields, format)
+
+def list_response(request, view, variant, records, page, record_type):
+    if page.fields:
+        unknown = [f for f in page.fields if f not in record_type.FIELDS]
+        if unknown:
+            return JSONResponse(status_code=400, content={"error": f"Unknown fields: {', '.join(unknown)}"})
+    try:
+        start, version = decode_cursor(page.cursor) if page.cursor else (0, None)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    if version is not None and version != view.version(variant, records):
+        return JSONResponse(status_code=409, content={"error": "The list changed since this cursor was issued; "
+                                                               "start again from the first page"})
+
+    end = len(records) if page.limit is None else min(start + page.limit, len(records))
+    headers = {"X-Next-Cursor": encode_cursor(end, view.version(variant, records))} if end < len(records) else {}
+    if page.format == "ndjson":
+        rows = (project(records[i], page.fields) for i in range(start, end))
+        return ndjson_response(rows, headers)
+
+    if start or end < len(records):
+        variant, records = (variant, start, end), records[start:end]
+    response = encoded_response(request, view.encoded(variant, records, page.fields))
+    response.headers.update(headers)
+    return response
 
 @app.get("/")
-def home():
+async def home():
     return {"message": "Sports API - Scores, Predictions & Fixtures"}
 
-@lru_cache(maxsize=1)
-def cached_scores_all(date_str: str = None):
-    return scrape_scores_all(date_str)
+async def cached_scores_all(date_str: str = None, sport: str = None, league: str = None):
+    keys = [(s, l, date_str) for s, l in list_score_sources(sport, league)]
+    return await cached_view(("scores", tuple(keys)), await scheduler.get_many_async("scores", keys, REQUEST_TIMEOUT))
+
+# ?from=&to= ranges and /scores/batch: every source is loaded once for the
+# whole range and the days are sliced out of the view's date index
+MAX_RANGE_DAYS = 92
+
+def parse_range(from_str, to_str):
+    # (start, end) dates; ValueError carries the message for the client
+    start, end = parse_date(from_str), parse_date(to_str or from_str)
+    if start is None or end is None:
+        raise ValueError("Dates must be YYYY-MM-DD")
+    if end < start:
+        raise ValueError("'to' is before 'from'")
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise ValueError(f"Date ranges are limited to {MAX_RANGE_DAYS} days")
+    return start, end
+
+async def cached_score_range(start, end, sport: str = None, league: str = None):
+    keys = list(dict.fromkeys(score_range_key(s, l, start, end) for s, l in list_score_sources(sport, league)))
+    data = await scheduler.get_many_async("score_ranges", keys, REQUEST_TIMEOUT)
+    return await cached_view(("score_ranges", tuple(keys)), data)
+
+async def score_range_response(request, from_str, to_str, sport, page):
+    try:
+        start, end = parse_range(from_str, to_str)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    view = await cached_score_range(start, end, sport)
+    records = view.between(start, end)
+    if not records:
+        return JSONResponse(status_code=404, content={"error": f"No scores from {start} to {end}"})
+    return list_response(request, view, ("between", sport and sport.lower(), start, end), records, page, Match)
 
 @app.get("/scores")
-def get_all_scores(date: str = Query(None)):
-    today = date or date.today().isoformat()
-    data = cached_scores_all(today)
-    if not data:
+async def get_all_scores(request: Request, date_str: str = Query(None, alias="date"),
+                         from_str: str = Query(None, alias="from"), to_str: str = Query(None, alias="to"),
+                         page: Page = Depends(page_params)):
+    if from_str or to_str:
+        return await score_range_response(request, from_str or to_str, to_str, None, page)
+    today = date_str or date.today().isoformat()
+    view = await cached_scores_all(today)
+    if not view:
         return JSONResponse(status_code=404, content={"error": f"No scores for {today}"})
-    return sorted(data, key=lambda x: (x.get("sport", ""), x.get("date", "")))
+    return list_response(request, view, "timeline", view.timeline, page, Match)
+
+# Server-sent events: a "snapshot" event with today's scores, then a "diff"
+# event ({sport, league, date, changed, removed}) whenever a scrape changes them
+@app.get("/scores/live")
+async def live_scores(request: Request, sport: str = None):
+    last_event_id = request.headers.get("last-event-id")
+    # Subscribe first so nothing published while the snapshot loads is missed
+    subscriber = broadcaster.subscribe(sport, last_event_id)
+    initial = None
+    if last_event_id is None:
+        try:
+            view = await cached_scores_all(date.today().isoformat(), sport)
+        except Exception:
+            broadcaster.unsubscribe(subscriber)
+            raise
+        body = view.encoded("timeline", view.timeline) if sport is None else \
+            view.encoded(("sport", sport.lower()), view.sport(sport))
+        initial = b"event: snapshot\ndata: " + body.identity + b"\n\n"
+    return StreamingResponse(broadcaster.stream(subscriber, initial), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# {"YYYY-MM-DD": [scores]} for a comma-separated list of dates, e.g. a
+# week or a calendar month in one request
+@app.get("/scores/batch")
+async def get_scores_batch(request: Request, dates: str, sport: str = None, league: str = None,
+                           fields: str = None):
+    days = sorted({parse_date(d.strip()) for d in dates.split(",") if d.strip()}, key=lambda d: d or date.min)
+    if not days or days[0] is None:
+        return JSONResponse(status_code=400, content={"error": "dates must be comma-separated YYYY-MM-DD dates"})
+    try:
+        start, end = parse_range(days[0].isoformat(), days[-1].isoformat())
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    fields = tuple(f.strip() for f in fields.split(",") if f.strip()) if fields else None
+    unknown = [f for f in fields or () if f not in Match.FIELDS]
+    if unknown:
+        return JSONResponse(status_code=400, content={"error": f"Unknown fields: {', '.join(unknown)}"})
+    view = await cached_score_range(start, end, sport, league)
+    return encoded_response(request, view.encoded_by_date(days, fields))
 
 @app.get("/scores/{sport}")
-def get_scores(sport: str, date: str = Query(None)):
-    today = date or date.today().isoformat()
-    data = cached_scores_all(today)
-    # Convert sport parameter to proper case for matching
-    sport_map = {
-        "soccer": "Soccer",
-        "mlb": "MLB", 
-        "nhl": "NHL",
-        "nba": "NBA",
-        "nfl": "NFL"
-    }
-    sport_name = sport_map.get(sport.lower(), sport)
-    filtered = [m for m in data if m.get("sport", "").lower() == sport_name.lower()]
+async def get_scores(request: Request, sport: str, date_str: str = Query(None, alias="date"),
+                     from_str: str = Query(None, alias="from"), to_str: str = Query(None, alias="to"),
+                     page: Page = Depends(page_params)):
+    if from_str or to_str:
+        return await score_range_response(request, from_str or to_str, to_str, sport, page)
+    today = date_str or date.today().isoformat()
+    view = await cached_scores_all(today, sport)
+    filtered = view.sport(sport)
     if not filtered:
         return JSONResponse(status_code=404, content={"error": f"No {sport} scores for {today} (check season)"})
-    return filtered
+    return list_response(request, view, ("sport", sport.lower()), filtered, page, Match)
+
+async def model_predictions():
+    # For the coming week's fixtures that are already cached: a cold or
+    # failing fixtures source must not hold up the scraped predictions, and
+    # its games join in once the background scrape lands. Recomputed only
+    # when the fixtures view or the model changes; NumPy and team-name
+    # resolution run off the event loop.
+    keys = default_fixture_keys()
+    cached = [(key, data) for key, data in zip(keys, scheduler.peek_many("fixtures", keys)) if data is not None]
+    if not cached:
+        # The empty tuple is one object, so the predictions view isn't rebuilt
+        return ()
+    view = await cached_view(("fixtures", tuple(key for key, _ in cached)), [data for _, data in cached])
+    return await run_in_threadpool(strength_model.predict_cached, view.records)
 
-@lru_cache(maxsize=1)
-def cached_predictions_all():
-    return scrape_predictions_all()
+async def cached_predictions_all():
+    scraped = await scheduler.get_many_async("predictions", default_prediction_keys(), REQUEST_TIMEOUT)
+    return await cached_view(("predictions",), scraped + [await model_predictions()])
 
 @app.get("/predictions")
-def get_all_predictions():
-    data = cached_predictions_all()
-    if data and all("error" in d for d in data):
+async def get_all_predictions(request: Request, page: Page = Depends(page_params)):
+    view = await cached_predictions_all()
+    if not view:
         return JSONResponse(status_code=503, content={"error": "Predictions sources down; retry later"})
-    return sorted(data, key=lambda x: (x.get("sport", ""), x.get("league", "")))
+    return list_response(request, view, "records", view.records, page, Prediction)
 
 @app.get("/predictions/{sport}")
-def get_predictions(sport: str):
-    data = cached_predictions_all()
-    # Convert sport parameter to proper case for matching
-    sport_map = {
-        "soccer": "Soccer",
-        "mlb": "MLB", 
-        "nhl": "NHL",
-        "nba": "NBA",
-        "nfl": "NFL"
-    }
-    sport_name = sport_map.get(sport.lower(), sport)
-    filtered = [p for p in data if p.get("sport", "").lower() == sport_name.lower()]
+async def get_predictions(request: Request, sport: str, page: Page = Depends(page_params)):
+    view = await cached_predictions_all()
+    filtered = view.sport(sport)
     if not filtered:
         return JSONResponse(status_code=404, content={"error": f"No predictions for {sport}"})
-    return filtered
+    return list_response(request, view, ("sport", sport.lower()), filtered, page, Prediction)
 
 @app.get("/predictions/soccer/{league}")
-def get_soccer_predictions(league: str):
-    data = [p for p in cached_predictions_all() if p.get("sport") == "Soccer"]
-    filtered = [p for p in data if league.lower() in p.get("league", "").lower()]
+async def get_soccer_predictions(request: Request, league: str, page: Page = Depends(page_params)):
+    view = await cached_predictions_all()
+    filtered = view.league("Soccer", league)
     if not filtered:
         return JSONResponse(status_code=404, content={"error": f"No {league} predictions"})
-    return filtered
+    return list_response(request, view, ("league", "soccer", league.lower()), filtered, page, Prediction)
 
 # Fixtures endpoints
-@lru_cache(maxsize=1)
-def cached_fixtures_all(days_ahead: int = 7):
-    return scrape_fixtures_all(days_ahead)
+async def cached_fixtures_all(days_ahead: int = 7, sport: str = None, league: str = None):
+    keys = [(s, l, days_ahead) for s, l in list_fixture_sources(sport, league)]
+    data = await scheduler.get_many_async("fixtures", keys, REQUEST_TIMEOUT)
+    return await cached_view(("fixtures", tuple(keys)), data)
+
+# ?date=YYYY-MM-DD: one day's fixtures from the sources that can be queried
+# by date, keyed (sport, league, date) like `backfill.py fixtures` stores them
+async def cached_fixture_day(date_str, sport: str = None, league: str = None):
+    keys = [(s, l, date_str) for s, l in list_fixture_range_sources(sport, league)]
+    data = await scheduler.get_many_async("fixture_days", keys, REQUEST_TIMEOUT)
+    return await cached_view(("fixture_days", tuple(keys)), data)
+
+async def cached_fixtures(days_ahead, date_str=None, sport: str = None, league: str = None):
+    # (view, the window as the 404s describe it)
+    if date_str is None:
+        return await cached_fixtures_all(days_ahead, sport, league), f"next {days_ahead} days"
+    return await cached_fixture_day(date_str, sport, league), date_str
+
+def invalid_date(date_str):
+    if date_str is not None and parse_date(date_str) is None:
+        return JSONResponse(status_code=400, content={"error": "date must be YYYY-MM-DD"})
+    return None
 
 @app.get("/fixtures")
-def get_all_fixtures(days_ahead: int = Query(7, ge=1, le=30)):
-    data = cached_fixtures_all(days_ahead)
-    if not data:
-        return JSONResponse(status_code=404, content={"error": f"No fixtures found for next {days_ahead} days"})
-    return sorted(data, key=lambda x: (x.get("sport", ""), x.get("date", ""), x.get("time", "")))
+async def get_all_fixtures(request: Request, days_ahead: int = Query(7, ge=1, le=30),
+                           date_str: str = Query(None, alias="date"), page: Page = Depends(page_params)):
+    error = invalid_date(date_str)
+    if error:
+        return error
+    view, window = await cached_fixtures(days_ahead, date_str)
+    if not view:
+        return JSONResponse(status_code=404, content={"error": f"No fixtures found for {window}"})
+    return list_response(request, view, "timeline", view.timeline, page, Fixture)
 
 @app.get("/fixtures/{sport}")
-def get_fixtures(sport: str, days_ahead: int = Query(7, ge=1, le=30)):
-    data = cached_fixtures_all(days_ahead)
-    if not data:
-        return JSONResponse(status_code=404, content={"error": f"No fixtures found for next {days_ahead} days"})
-    
-    # Convert sport parameter to proper case for matching
-    sport_map = {
-        "soccer": "Soccer",
-        "mlb": "MLB", 
-        "nhl": "NHL",
-        "nba": "NBA",
-        "nfl": "NFL"
-    }
-    sport_name = sport_map.get(sport.lower(), sport)
-    filtered = [m for m in data if m.get("sport", "").lower() == sport_name.lower()]
+async def get_fixtures(request: Request, sport: str, days_ahead: int = Query(7, ge=1, le=30),
+                       date_str: str = Query(None, alias="date"), page: Page = Depends(page_params)):
+    error = invalid_date(date_str)
+    if error:
+        return error
+    view, window = await cached_fixtures(days_ahead, date_str, sport)
+    if not view:
+        return JSONResponse(status_code=404, content={"error": f"No fixtures found for {window}"})
+    filtered = view.sport(sport)
     if not filtered:
-        return JSONResponse(status_code=404, content={"error": f"No {sport} fixtures for next {days_ahead} days"})
-    return filtered
+        return JSONResponse(status_code=404, content={"error": f"No {sport} fixtures for {window}"})
+    return list_response(request, view, ("sport", sport.lower()), filtered, page, Fixture)
 
 @app.get("/fixtures/soccer/{league}")
-def get_soccer_fixtures(league: str, days_ahead: int = Query(7, ge=1, le=30)):
-    data = cached_fixtures_all(days_ahead)
-    if not data:
-        return JSONResponse(status_code=404, content={"error": f"No fixtures found for next {days_ahead} days"})
-    
-    soccer_data = [p for p in data if p.get("sport") == "Soccer"]
-    filtered = [p for p in soccer_data if league.lower() in p.get("league", "").lower()]
+async def get_soccer_fixtures(request: Request, league: str, days_ahead: int = Query(7, ge=1, le=30),
+                              date_str: str = Query(None, alias="date"), page: Page = Depends(page_params)):
+    error = invalid_date(date_str)
+    if error:
+        return error
+    view, window = await cached_fixtures(days_ahead, date_str, "Soccer", league)
+    if not view:
+        return JSONResponse(status_code=404, content={"error": f"No fixtures found for {window}"})
+    filtered = view.league("Soccer", league)
     if not filtered:
-        return JSONResponse(status_code=404, content={"error": f"No {league} fixtures for next {days_ahead} days"})
-    return filtered
+        return JSONResponse(status_code=404, content={"error": f"No {league} fixtures for {window}"})
+    return list_response(request, view, ("league", "soccer", league.lower()), filtered, page, Fixture)
+
+# Joined matches: one entry per game with its fixture, today's live or final
+# score and a prediction, keyed by canonical match ID. One index per window;
+# each request re-applies the current snapshots, which only re-joins the
+# sources that changed.
+match_indexes = {}
+
+async def cached_matches(days_ahead: int = 7):
+    today = date.today().isoformat()
+    score_keys = [(s, l, today) for s, l in list_score_sources()]
+    fixture_keys = [(s, l, days_ahead) for s, l in list_fixture_sources()]
+    prediction_keys = default_prediction_keys()
+    scores, fixtures, predictions, fixtures_view = await asyncio.gather(
+        scheduler.get_many_async("scores", score_keys, REQUEST_TIMEOUT),
+        scheduler.get_many_async("fixtures", fixture_keys, REQUEST_TIMEOUT),
+        scheduler.get_many_async("predictions", prediction_keys, REQUEST_TIMEOUT),
+        cached_fixtures_all(days_ahead))
+    parts = {("scores",) + key: data for key, data in zip(score_keys, scores)}
+    parts.update({("fixtures",) + key: data for key, data in zip(fixture_keys, fixtures)})
+    parts.update({("predictions",) + key: data for key, data in zip(prediction_keys, predictions)})
+    parts[("model",)] = await run_in_threadpool(strength_model.predict_cached, fixtures_view.records)
+    return await run_in_threadpool(join_matches, days_ahead, parts)
 
-# Allow GET for refresh (simple cache clear)
+def join_matches(days_ahead, parts):
+    # Resolves new team names (a store write each) and re-joins changed
+    # sources, so it runs off the event loop
+    index = match_indexes.setdefault(days_ahead, MatchIndex())
+    index.update(parts, model_sources=[("model",)])
+    return index, views.get(("matches", days_ahead), [index.records()])
+
+@app.get("/matches")
+async def get_matches(request: Request, sport: str = None, days_ahead: int = Query(7, ge=1, le=30),
+                      page: Page = Depends(page_params)):
+    _, view = await cached_matches(days_ahead)
+    records = view.sport(sport) if sport else view.timeline
+    if not records:
+        return JSONResponse(status_code=404, content={"error": f"No matches for the next {days_ahead} days"})
+    return list_response(request, view, ("sport", sport.lower()) if sport else "timeline", records, page,
+                         JoinedMatch)
+
+def match_window(match_id):
+    # Smallest /matches window (at least the default week) holding the date
+    # in a match ID, so IDs from ?days_ahead=30 resolve too
+    day = parse_date(match_id.split(":")[1]) if match_id.count(":") >= 2 else None
+    if day is None:
+        return 7
+    return min(max((day - date.today()).days + 1, 7), 30)
+
+@app.get("/matches/{match_id}")
+async def get_match(match_id: str, days_ahead: int = Query(None, ge=1, le=30)):
+    index, _ = await cached_matches(days_ahead or match_window(match_id))
+    match = index.get(match_id)
+    if match is None:
+        return JSONResponse(status_code=404, content={"error": f"No match {match_id}"})
+    return match.to_dict()
+
+# Allow GET for refresh; re-scrapes in the background while the last
+# snapshots keep being served
 @app.get("/refresh")
 @app.post("/refresh")
-def refresh_cache():
-    cached_scores_all.cache_clear()
-    cached_predictions_all.cache_clear()
-    cached_fixtures_all.cache_clear()
-    return {"message": "Cache refreshed"}
+async def refresh_cache():
+    scheduler.refresh_all()
+    return {"message": "Cache refresh started"}
+
+@app.get("/cache/stats")
+async def cache_stats():
+    stats = scheduler.stats()
+    stats["views"] = views.stats()
+    stats["live"] = broadcaster.stats()
+    stats["http"] = response_cache_stats()
+    stats["hosts"] = host_health_stats()
+    stats["worker"] = scheduler.worker_stats()
+    stats["model"] = strength_model.stats()
+    stats["entities"] = resolver.stats()
+    stats["matches"] = {days: index.stats() for days, index in match_indexes.items()}
+    return stats
+
+# Prometheus text format: fetch/parse/refresh/request histograms plus cache,
+# snapshot and breaker gauges
+@app.get("/metrics")
+async def get_metrics():
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # Workers share snapshots through the store and only the leader scrapes,
+    # so adding workers doesn't add upstream load
+    workers = int(os.environ.get("MKSPORTS_WORKERS", "1"))
+    if workers > 1:
+        uvicorn.run("api:app", host="0.0.0.0", port=8000, workers=workers)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
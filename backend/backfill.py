@@ -0,0 +1,97 @@
+import argparse
+import time
+from datetime import timedelta
+from fetcher import run_all
+from records import league_matches, parse_date
+from scraper_scores import SCORE_RANGE_SOURCES, scrape_scores_range
+from scraper_fixtures import FIXTURE_RANGE_SOURCES, scrape_fixtures_range
+from store import DEFAULT_DB_PATH, SnapshotStore
+from entities import resolver
+from profiling import add_profile_argument, profiled
+
+# Batch backfill of scores or fixtures for a date range into the snapshot
+# store. Each source is scraped once for the whole range (one season page
+# per soccer league, month-sized windows for MLB, one request per week for
+# NHL), sources run in parallel under the fetcher's per-host limits, and the
+# rows are split by date in one pass. Every day is saved as its own
+# (sport, league, date) snapshot, the API's own cache keys for /scores?date=
+# and /fixtures?date=, so backfilled dates are served without scraping.
+#
+#   python backfill.py scores --start 2025-08-01 --end 2026-05-31
+#   python backfill.py fixtures --start 2026-10-17 --end 2026-11-30 --sport MLB
+
+# kind -> (range sources, range scraper, store dataset)
+BACKFILLS = {
+    "scores": (SCORE_RANGE_SOURCES, scrape_scores_range, "scores"),
+    "fixtures": (FIXTURE_RANGE_SOURCES, scrape_fixtures_range, "fixture_days"),
+}
+
+
+def date_range(start, end):
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def scrape_range(scrape, sport, league, start, end):
+    # None marks a failed source, so its days aren't stored as "no games"
+    try:
+        return scrape(sport, league, start, end)
+    except Exception as e:
+        print(f"Error backfilling {sport} {league}: {e}")
+        return None
+
+
+def backfill(kind, start, end, sport=None, league=None, store=None):
+    # Returns {(sport, league): records found, or None if the source failed}
+    store = store or SnapshotStore()
+    # Team IDs resolved along the way go to the same database as the rows
+    resolver.use_database(store.path)
+    range_sources, scrape, dataset = BACKFILLS[kind]
+    sources = [(s, l) for s, l in range_sources
+               if (sport is None or s.lower() == sport.lower())
+               and (league is None or league_matches(league, l))]
+    results = run_all([(scrape_range, (scrape, s, l, start, end)) for s, l in sources])
+
+    days = date_range(start, end)
+    items = []
+    summary = {}
+    for (s, l), records in zip(sources, results):
+        summary[(s, l)] = None if records is None else len(records)
+        if records is None:
+            continue
+        by_date = {}
+        for record in records:
+            by_date.setdefault(record.date, []).append(record)
+        items.extend(((s, l, day.isoformat()), by_date.get(day, [])) for day in days)
+
+    if items:
+        store.save_many(dataset, items, time.time())
+    return summary
+
+
+def _date_arg(value):
+    parsed = parse_date(value)
+    if parsed is None:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD, got {value!r}")
+    return parsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill scores or fixtures for a date range into the snapshot store")
+    parser.add_argument("kind", choices=sorted(BACKFILLS))
+    parser.add_argument("--start", type=_date_arg, required=True, help="first date (YYYY-MM-DD)")
+    parser.add_argument("--end", type=_date_arg, required=True, help="last date (YYYY-MM-DD), inclusive")
+    parser.add_argument("--sport", help="only this sport, e.g. Soccer")
+    parser.add_argument("--league", help="only this league, e.g. premier-league")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="snapshot database path")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    if args.end < args.start:
+        parser.error("--end is before --start")
+
+    started = time.perf_counter()
+    with profiled(f"backfill_{args.kind}", args.profile):
+        summary = backfill(args.kind, args.start, args.end, args.sport, args.league, SnapshotStore(args.db))
+    for (sport, league), count in summary.items():
+        print(f"{sport} {league}: " + ("failed" if count is None else f"{count} records"))
+    print(f"Backfilled {len(date_range(args.start, args.end))} days of {args.kind} "
+          f"in {time.perf_counter() - started:.1f}s")
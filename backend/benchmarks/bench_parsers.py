@@ -0,0 +1,88 @@
+import os
+import sys
+import time
+from bs4 import BeautifulSoup
+
+# Compares the original BeautifulSoup/html.parser row loops with the parsing
+# module on the saved pages in benchmarks/fixtures, checking both produce the
+# same rows. Run from backend/: python benchmarks/bench_parsers.py [iterations]
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import parsing
+from replay import load_fixture
+
+
+def legacy_fbref_schedule_rows(text):
+    soup = BeautifulSoup(text, "html.parser")
+    rows_out = []
+    table = soup.find("table", id="sched_all")
+    if table:
+        rows = table.find("tbody").find_all("tr")
+        for row in rows:
+            if any(cls in row.get("class", []) for cls in ["thead", "over_header"]):
+                continue
+            date_cell = row.find("td", {"data-stat": "date"})
+            home_cell = row.find("td", {"data-stat": "home_team"})
+            away_cell = row.find("td", {"data-stat": "away_team"})
+            score_cell = row.find("td", {"data-stat": "score"})
+            match_date = date_cell.text.strip() if date_cell else None
+            home = home_cell.text.strip() if home_cell else None
+            away = away_cell.text.strip() if away_cell else None
+            score = score_cell.text.strip() if score_cell else "TBD"
+            if home and away and match_date:
+                rows_out.append((match_date, home, away, score))
+    return rows_out
+
+
+def legacy_espn_fixture_rows(text):
+    soup = BeautifulSoup(text, "html.parser")
+    rows_out = []
+    date_text = None
+    for table in soup.find_all("table", class_="Table"):
+        for row in table.find_all("tr", class_="Table__TR"):
+            if row.get("class") and "Table__header" in row.get("class"):
+                continue
+            if "Table__sub-header" in row.get("class", []):
+                date_text = row.get_text().strip()
+                continue
+            teams = row.find_all("a", class_="AnchorLink")
+            if len(teams) >= 2:
+                time_cell = row.find("td", class_="date__col")
+                match_time = time_cell.get_text().strip() if time_cell else "TBD"
+                rows_out.append((date_text, match_time, teams[0].get_text().strip(), teams[1].get_text().strip()))
+    return rows_out
+
+
+def timed(func, text, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        result = func(text)
+    return (time.perf_counter() - start) / iterations, result
+
+
+def run(iterations=5):
+    cases = [
+        ("fbref_schedule.html", legacy_fbref_schedule_rows, [
+            ("parsing (%s)" % ("lxml" if parsing.lxml_html is not None else "html.parser"), parsing.fbref_schedule_rows),
+            ("parsing (html.parser)", parsing._fbref_schedule_rows_bs4),
+        ]),
+        ("espn_fixtures.html", legacy_espn_fixture_rows, [
+            ("parsing (%s)" % ("lxml" if parsing.lxml_html is not None else "html.parser"), parsing.espn_fixture_rows),
+            ("parsing (html.parser)", parsing._espn_fixture_rows_bs4),
+        ]),
+    ]
+    for filename, legacy, candidates in cases:
+        text = load_fixture(filename)
+        base_time, expected = timed(legacy, text, iterations)
+        print(f"{filename} ({len(text) / 1024:.0f} KiB, {len(expected)} rows)")
+        print(f"  {'legacy (html.parser)':<24} {base_time * 1000:8.1f} ms")
+        for name, func in candidates:
+            elapsed, result = timed(func, text, iterations)
+            status = "ok" if result == expected else "MISMATCH"
+            print(f"  {name:<24} {elapsed * 1000:8.1f} ms  {base_time / elapsed:5.1f}x  {status}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
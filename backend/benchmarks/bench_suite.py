@@ -0,0 +1,183 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+# Offline benchmark suite: parse time per upstream page, full scrape time and
+# memory peak for the three scrapers, and API latency/throughput under load,
+# all against the saved fixtures served by benchmarks/replay.py (see there
+# for which pages are recorded, reconstructed or synthetic).
+# Run from backend/: python benchmarks/bench_suite.py [--latency 0.05] [--json out.json]
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+WORK_DIR = tempfile.mkdtemp(prefix="mksports-bench-")
+os.environ.setdefault("MKSPORTS_DB", os.path.join(WORK_DIR, "bench.db"))
+
+import fetcher
+from replay import ReplayAdapter, load_fixture
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def bench_parse(iterations):
+    import scraper_scores
+    import scraper_fixtures
+    import scraper_predictions
+    cases = [
+        ("fbref_schedule.html", scraper_scores.parse_fbref_schedule),
+        ("espn_fixtures.html", scraper_fixtures.parse_espn_fixtures),
+        ("oddsportal_matches.html", scraper_predictions.parse_oddsportal_matches),
+        ("bbref_playoff_odds.html", scraper_predictions.parse_playoff_odds),
+        ("mlb_schedule.json", fetcher.parse_json),
+        ("nhl_schedule.json", fetcher.parse_json),
+        ("nba_scoreboard.json", fetcher.parse_json),
+        ("nfl_scoreboard.json", fetcher.parse_json),
+    ]
+    results = {}
+    for filename, parse in cases:
+        res = FakeResponse(load_fixture(filename))
+        start = time.perf_counter()
+        for _ in range(iterations):
+            parse(res)
+        results[filename] = (time.perf_counter() - start) / iterations * 1000
+    return results
+
+
+def bench_scrape(runs):
+    from scraper_scores import scrape_scores_all
+    from scraper_fixtures import scrape_fixtures_all
+    from scraper_predictions import scrape_predictions_all
+    cases = [
+        ("scrape_scores_all", scrape_scores_all, ()),
+        ("scrape_fixtures_all", scrape_fixtures_all, (30,)),
+        ("scrape_predictions_all", scrape_predictions_all, ()),
+    ]
+    results = {}
+    for name, func, args in cases:
+        for mode in ("cold", "warm"):
+            times = []
+            peak = 0
+            records = 0
+            for _ in range(runs):
+                if mode == "cold":
+                    fetcher.clear_response_cache()
+                tracemalloc.start()
+                start = time.perf_counter()
+                records = len(func(*args))
+                times.append(time.perf_counter() - start)
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+            results[f"{name} ({mode})"] = {
+                "ms": statistics.median(times) * 1000,
+                "peak_kib": peak / 1024,
+                "records": records,
+            }
+    return results
+
+
+def bench_api(requests_per_endpoint, concurrency):
+    from fastapi.testclient import TestClient
+    import api
+
+    endpoints = ["/scores", "/scores/mlb", "/fixtures?days_ahead=30", "/fixtures/soccer/premier",
+                 "/predictions", "/predictions/soccer"]
+    results = {}
+    with TestClient(api.app, raise_server_exceptions=False) as client:
+        for endpoint in endpoints:
+            client.get(endpoint)  # warm the cache; cold load is covered by bench_scrape
+            latencies = []
+            errors = []
+            lock = threading.Lock()
+
+            def worker(count):
+                local = []
+                failed = 0
+                for _ in range(count):
+                    start = time.perf_counter()
+                    status = client.get(endpoint).status_code
+                    local.append(time.perf_counter() - start)
+                    # A 404 or 4xx is as much a failure as a 5xx: its latency isn't the route's
+                    failed += not (200 <= status < 300 or status == 304)
+                with lock:
+                    latencies.extend(local)
+                    errors.append(failed)
+
+            per_thread = max(1, requests_per_endpoint // concurrency)
+            threads = [threading.Thread(target=worker, args=(per_thread,)) for _ in range(concurrency)]
+            start = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - start
+            results[endpoint] = {
+                "p50_ms": percentile(latencies, 50) * 1000,
+                "p95_ms": percentile(latencies, 95) * 1000,
+                "p99_ms": percentile(latencies, 99) * 1000,
+                "rps": len(latencies) / elapsed,
+                "errors": sum(errors),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline scraper and API benchmarks")
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated upstream latency per request (s)")
+    parser.add_argument("--polite", action="store_true", help="keep the per-host politeness delays")
+    parser.add_argument("--parse-iterations", type=int, default=5)
+    parser.add_argument("--scrape-runs", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=400, help="API requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    if not args.polite:
+        for host, (max_concurrent, delay) in list(fetcher.HOST_LIMITS.items()):
+            fetcher.HOST_LIMITS[host] = (max_concurrent, 0.0)
+        fetcher.reset_host_gates()
+    adapter = ReplayAdapter(latency=args.latency)
+    fetcher.set_transport(adapter)
+
+    results = {"parse_ms": bench_parse(args.parse_iterations)}
+    print("Parse time per page")
+    for filename, ms in results["parse_ms"].items():
+        print(f"  {filename:<28} {ms:8.2f} ms")
+
+    results["scrape"] = bench_scrape(args.scrape_runs)
+    print(f"Scrape time (replay latency {args.latency * 1000:.0f} ms, {adapter.requests} upstream requests)")
+    for name, r in results["scrape"].items():
+        print(f"  {name:<32} {r['ms']:8.1f} ms  peak {r['peak_kib']:8.0f} KiB  {r['records']:5d} records")
+
+    results["api"] = bench_api(args.requests, args.concurrency)
+    print(f"API endpoints ({args.concurrency} concurrent clients, cached data)")
+    for endpoint, r in results["api"].items():
+        print(f"  {endpoint:<28} p50 {r['p50_ms']:6.2f} ms  p95 {r['p95_ms']:6.2f} ms  "
+              f"p99 {r['p99_ms']:6.2f} ms  {r['rps']:7.0f} req/s"
+              + (f"  {r['errors']} errors" if r['errors'] else ""))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import os
+import re
+import threading
+import time
+from datetime import date, timedelta
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import BaseAdapter
+
+# Offline replay of the upstream sites from the saved pages in
+# benchmarks/fixtures. Mount it with fetcher.set_transport(ReplayAdapter()).
+# The saved pages carry {{today+N}} placeholders (ISO dates) or
+# {{today+N:FORMAT}} ones (strftime, plus %e for the unpadded day, as in
+# ESPN's "Saturday, September 6") so dated filters in the scrapers keep
+# matching whatever day the replay runs on. The FBref season is laid out
+# with its played games in the past and the rest ahead. The FBref and ESPN
+# pages are reconstructions of the live markup; the OddsPortal and
+# Baseball-Reference pages are synthetic (generated filler around the rows
+# the parsers read), so their timings say little about the live sites.
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# (host, path regex, fixture file, content type)
+ROUTES = [
+    ("fbref.com", r"^/en/comps/\d+/schedule/", "fbref_schedule.html", "text/html; charset=utf-8"),
+    ("www.espn.com", r"^/soccer/fixtures/", "espn_fixtures.html", "text/html; charset=utf-8"),
+    ("site.api.espn.com", r"^/apis/site/v2/sports/football/nfl/scoreboard", "nfl_scoreboard.json", "application/json"),
+    ("statsapi.mlb.com", r"^/api/v1/schedule", "mlb_schedule.json", "application/json"),
+    ("api-web.nhle.com", r"^/v1/schedule/", "nhl_schedule.json", "application/json"),
+    ("cdn.nba.com", r"^/static/json/liveData/scoreboard/", "nba_scoreboard.json", "application/json"),
+    ("www.oddsportal.com", r"^/matches/soccer/", "oddsportal_matches.html", "text/html; charset=utf-8"),
+    ("www.baseball-reference.com", r"^/leagues/majors/\d+-playoff-odds", "bbref_playoff_odds.html", "text/html; charset=utf-8"),
+]
+
+_PLACEHOLDER = re.compile(r"\{\{today([+-]\d+)(?::([^}]+))?\}\}")
+
+
+def _render_date(match, today):
+    day = today + timedelta(days=int(match.group(1)))
+    fmt = match.group(2)
+    return day.isoformat() if fmt is None else day.strftime(fmt.replace("%e", str(day.day)))
+
+
+def load_fixture(filename, today=None):
+    today = today or date.today()
+    with open(os.path.join(FIXTURES_DIR, filename), encoding="utf-8") as f:
+        text = f.read()
+    return _PLACEHOLDER.sub(lambda m: _render_date(m, today), text)
+
+
+class ReplayAdapter(BaseAdapter):
+    # latency: seconds added to every response, or {host: seconds}
+    def __init__(self, latency=0.0, routes=ROUTES):
+        super().__init__()
+        self.latency = latency
+        self.routes = [(host, re.compile(pattern), filename, content_type)
+                       for host, pattern, filename, content_type in routes]
+        self._bodies = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    def _body(self, filename):
+        with self._lock:
+            body = self._bodies.get(filename)
+            if body is None:
+                body = load_fixture(filename).encode("utf-8")
+                self._bodies[filename] = body
+            return body
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        parsed = urlparse(request.url)
+        with self._lock:
+            self.requests += 1
+        latency = self.latency.get(parsed.hostname, 0.0) if isinstance(self.latency, dict) else self.latency
+        if latency:
+            time.sleep(latency)
+
+        response = requests.Response()
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        for host, pattern, filename, content_type in self.routes:
+            if parsed.hostname == host and pattern.search(parsed.path):
+                response.status_code = 200
+                response._content = self._body(filename)
+                response.headers["Content-Type"] = content_type
+                response.encoding = "utf-8"
+                break
+        else:
+            response.status_code = 404
+            response._content = b""
+            response.reason = "No recorded fixture"
+        return response
+
+    def close(self):
+        pass
@@ -0,0 +1,116 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+import requests
+
+# Per-host health tracking for the fetch engine. A host that keeps failing
+# trips its breaker open: requests to it fail fast with HostUnavailable until
+# a jittered, exponentially growing cooldown passes, then a single probe
+# request decides whether it closes again. A 429/503 Retry-After holds the
+# host off for at least as long as it asks.
+
+# Consecutive failures that open the breaker
+FAILURE_THRESHOLD = 3
+# Cooldown after the first trip; doubles on every trip in a row
+BASE_COOLDOWN = 30.0
+MAX_COOLDOWN = 15 * 60.0
+
+
+class HostUnavailable(requests.RequestException):
+    pass
+
+
+def jittered(delay):
+    # "Equal jitter": half the delay fixed, half random, so hosts that failed
+    # together don't all retry in the same instant
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def backoff_delay(attempt, base=1.0, cap=30.0):
+    return jittered(min(cap, base * 2 ** attempt))
+
+
+def retry_after_seconds(headers):
+    # Retry-After as delta-seconds or an HTTP date; None when absent/invalid
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, host, failure_threshold=FAILURE_THRESHOLD, base_cooldown=BASE_COOLDOWN,
+                 max_cooldown=MAX_COOLDOWN):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.open_until = 0.0
+        self.last_error = None
+        self.rejected = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_request(self):
+        # Raises HostUnavailable while open; after the cooldown lets exactly
+        # one probe through (half-open) and keeps rejecting the rest
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and time.time() >= self.open_until:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            self.rejected += 1
+            wait = max(0.0, self.open_until - time.time())
+        raise HostUnavailable(f"{self.host} is unavailable ({self.last_error}); retrying in {wait:.0f}s")
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.trips = 0
+            self._probing = False
+
+    def record_failure(self, error, retry_after=None):
+        with self._lock:
+            self.failures += 1
+            self.last_error = error
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.trips += 1
+                cooldown = jittered(min(self.max_cooldown, self.base_cooldown * 2 ** (self.trips - 1)))
+                self.open_until = time.time() + max(cooldown, retry_after or 0)
+                self.state = self.OPEN
+                self._probing = False
+            elif retry_after:
+                # The host told us how long to stay away; hold off exactly that long
+                self.open_until = max(self.open_until, time.time() + retry_after)
+                self.state = self.OPEN
+                self._probing = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "trips": self.trips,
+                "open_for": round(max(0.0, self.open_until - time.time()), 1) if self.state != self.CLOSED else 0,
+                "rejected": self.rejected,
+                "last_error": self.last_error,
+            }
@@ -0,0 +1,217 @@
+import re
+import sqlite3
+import threading
+import unicodedata
+from store import DEFAULT_DB_PATH
+
+# Canonical IDs for leagues and teams, so records from different sources can
+# be joined and filtered by plain dict lookups. FBref says "Manchester Utd",
+# ESPN "Manchester United"; statsapi says "New York Yankees", other feeds just
+# "Yankees". Every spelling resolves to one ID such as
+# "soccer:manchester-united" or "mlb:new-york-yankees".
+#
+# League IDs come straight from the normalized name. Team names are
+# normalized (accents, punctuation, club affixes), looked up in the alias
+# table, and registered on first sight. The table is kept in the snapshot
+# database, so every scraper, CLI and API worker resolves names the same way
+# and a name is only worked out once.
+
+# Short names accepted for a league in URLs: /fixtures/soccer/epl
+LEAGUE_ALIASES = {
+    "epl": "premier league",
+    "laliga": "la liga",
+    "bundes": "bundesliga",
+    "seriea": "serie a",
+    "ligue1": "ligue 1",
+    "major league soccer": "mls",
+}
+
+# Club-name affixes that sources add or drop: "AC Milan" / "Milan", "1. FC Köln"
+_SOCCER_AFFIXES = {"1", "fc", "cf", "afc", "sc", "ac", "as", "ssc", "cd", "ud", "rcd", "vfb", "vfl", "tsg",
+                   "fk", "de", "calcio"}
+
+# Spellings the normalization alone doesn't reconcile, normalized -> canonical
+SOCCER_TEAM_ALIASES = {
+    "manchester utd": "manchester united",
+    "man utd": "manchester united",
+    "newcastle utd": "newcastle united",
+    "newcastle": "newcastle united",
+    "sheffield utd": "sheffield united",
+    "nottham forest": "nottingham forest",
+    "tottenham": "tottenham hotspur",
+    "spurs": "tottenham hotspur",
+    "wolves": "wolverhampton wanderers",
+    "wolverhampton": "wolverhampton wanderers",
+    "west ham": "west ham united",
+    "brighton": "brighton and hove albion",
+    "leicester": "leicester city",
+    "ipswich": "ipswich town",
+    "leeds": "leeds united",
+    "paris s g": "paris saint germain",
+    "paris sg": "paris saint germain",
+    "psg": "paris saint germain",
+    "inter": "internazionale",
+    "inter milan": "internazionale",
+    "athletic club": "athletic bilbao",
+    "betis": "real betis",
+    "leverkusen": "bayer leverkusen",
+    "eint frankfurt": "eintracht frankfurt",
+    "gladbach": "borussia monchengladbach",
+    "monchengladbach": "borussia monchengladbach",
+    "dortmund": "borussia dortmund",
+    "bayern munchen": "bayern munich",
+    "hellas verona": "verona",
+    "marseille": "olympique marseille",
+    "lyon": "olympique lyonnais",
+}
+
+# Sports whose teams go by a nickname that is unique within the league, so
+# "Yankees" and "New York Yankees" can share an ID
+NICKNAME_SPORTS = {"MLB", "NHL", "NBA", "NFL"}
+
+
+def normalize_league(text):
+    # "Premier-League", "premier_league", "EPL" -> "premier league"
+    key = " ".join((text or "").lower().replace("-", " ").replace("_", " ").split())
+    return LEAGUE_ALIASES.get(key, key)
+
+
+_league_ids = {}
+
+
+def league_id(name):
+    # "Premier League", "premier-league", "EPL" -> "premier-league"
+    lid = _league_ids.get(name)
+    if lid is None:
+        if len(_league_ids) > 4096:
+            _league_ids.clear()
+        lid = _league_ids[name] = normalize_league(name).replace(" ", "-")
+    return lid
+
+
+def normalize_team(sport, name):
+    text = unicodedata.normalize("NFKD", name)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    text = re.sub(r"[^a-z0-9 ]", " ", text.replace("&", " and ").replace("'", "").replace("’", ""))
+    words = text.split()
+    if sport == "Soccer":
+        words = [w for w in words if w not in _SOCCER_AFFIXES] or words
+        alias = " ".join(words)
+        return SOCCER_TEAM_ALIASES.get(alias, alias)
+    return " ".join(words)
+
+
+class EntityResolver:
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        # (sport, normalized alias) -> team ID, loaded on first use
+        self._aliases = None
+        # (sport, name as scraped) -> team ID
+        self._names = {}
+        self._lock = threading.Lock()
+
+    def use_database(self, path):
+        # Keep aliases next to the snapshots of the store in use (backfill.py
+        # --db); names resolved against another database are forgotten
+        with self._lock:
+            if path == self.path:
+                return
+            self.path = path
+            self._aliases = None
+            self._names = {}
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS team_aliases (
+                sport TEXT NOT NULL,
+                alias TEXT NOT NULL,
+                team_id TEXT NOT NULL,
+                PRIMARY KEY (sport, alias)
+            )
+        """)
+        return conn
+
+    def _load(self):
+        self._aliases = {}
+        try:
+            conn = self._connect()
+            try:
+                for sport, alias, tid in conn.execute("SELECT sport, alias, team_id FROM team_aliases"):
+                    self._aliases[(sport, alias)] = tid
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"Error loading team aliases: {e}")
+
+    def _save(self, rows):
+        # Another process may have registered the same alias first; its ID wins
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany("INSERT OR IGNORE INTO team_aliases (sport, alias, team_id) VALUES (?, ?, ?)",
+                                     rows)
+                sport, alias, _ = rows[0]
+                row = conn.execute("SELECT team_id FROM team_aliases WHERE sport = ? AND alias = ?",
+                                   (sport, alias)).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"Error saving team aliases: {e}")
+            return rows[0][2]
+        return row[0] if row else rows[0][2]
+
+    def team_id(self, sport, name):
+        if not name:
+            return None
+        tid = self._names.get((sport, name))
+        if tid is None:
+            with self._lock:
+                if self._aliases is None:
+                    self._load()
+                tid = self._names[(sport, name)] = self._resolve(sport, name)
+        return tid
+
+    def _resolve(self, sport, name):
+        alias = normalize_team(sport, name)
+        tid = self._aliases.get((sport, alias))
+        if tid is not None:
+            return tid
+
+        # "New York Yankees" after "Yankees" was seen alone: reuse the
+        # nickname's ID. Every shorter suffix becomes an alias of this team
+        # unless another team has it already ("Sox").
+        words = alias.split()
+        nicknames = [" ".join(words[i:]) for i in range(1, len(words))] if sport in NICKNAME_SPORTS else []
+        prefix = sport.lower() + ":"
+        for nickname in nicknames:
+            if self._aliases.get((sport, nickname)) == prefix + nickname.replace(" ", "-"):
+                tid = prefix + nickname.replace(" ", "-")
+                break
+        else:
+            tid = prefix + alias.replace(" ", "-")
+
+        rows = [(sport, alias, tid)] + [(sport, n, tid) for n in nicknames if (sport, n) not in self._aliases]
+        tid = self._save(rows)
+        for row_sport, row_alias, _ in rows:
+            self._aliases.setdefault((row_sport, row_alias), tid)
+        return tid
+
+    def stats(self):
+        return {"aliases": len(self._aliases or ()), "names": len(self._names)}
+
+
+def match_id(sport, day, home_id, away_id):
+    # "nhl:2026-10-17:sabres-vs-blue-jackets"
+    return (f"{sport.lower()}:{day.isoformat() if day else 'tbd'}:"
+            f"{home_id.partition(':')[2]}-vs-{away_id.partition(':')[2]}")
+
+
+# Shared by every record; whoever opens a SnapshotStore points it at that
+# store's database with resolver.use_database()
+resolver = EntityResolver()
+
+
+def team_id(sport, name):
+    return resolver.team_id(sport, name)
@@ -0,0 +1,54 @@
+import csv
+import os
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Parquet export is optional
+    pyarrow = None
+
+# Off-request export of scraped records: one all_{name} file plus one file per
+# sport, e.g. all_scores.csv and mlb_scores.csv. Used by the scraper CLIs.
+
+
+def _columns(records):
+    # Union of keys in first-seen order so optional fields like "note" survive
+    columns = []
+    for record in records:
+        for key in record:
+            if key not in columns:
+                columns.append(key)
+    return columns
+
+
+def _write_csv(records, columns, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(records)
+
+
+def _write_parquet(records, columns, path):
+    table = pyarrow.Table.from_pylist([{c: r.get(c) for c in columns} for r in records])
+    pyarrow.parquet.write_table(table, path)
+
+
+def export_records(records, name, directory=".", fmt="csv"):
+    if fmt == "parquet" and pyarrow is None:
+        raise RuntimeError("Parquet export needs pyarrow installed")
+    writer = _write_parquet if fmt == "parquet" else _write_csv
+    columns = _columns(records)
+    paths = []
+
+    path = os.path.join(directory, f"all_{name}.{fmt}")
+    writer(records, columns, path)
+    paths.append(path)
+
+    by_sport = {}
+    for record in records:
+        by_sport.setdefault(record.get("sport") or "unknown", []).append(record)
+    for sport, sport_records in by_sport.items():
+        path = os.path.join(directory, f"{sport.lower()}_{name}.{fmt}")
+        writer(sport_records, columns, path)
+        paths.append(path)
+    return paths
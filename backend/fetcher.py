@@ -0,0 +1,269 @@
+import hashlib
+import requests
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from cache import TTLCache
+from breaker import CircuitBreaker, HostUnavailable, backoff_delay, retry_after_seconds
+from metrics import FETCH_SECONDS, FETCH_TOTAL, STAGE_SECONDS
+
+# Shared fetch engine for the scrapers: a bounded thread pool plus per-host
+# concurrency limits and politeness delays, so slow hosts only hold up their
+# own requests instead of every source queued behind them. Each host also has
+# a circuit breaker (breaker.py) so one that is down fails fast.
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+# host -> (max concurrent requests, minimum seconds between request starts)
+HOST_LIMITS = {
+    "fbref.com": (1, 2.0),
+    "www.espn.com": (2, 1.0),
+    "site.api.espn.com": (2, 0.5),
+    "statsapi.mlb.com": (4, 0.5),
+    "api-web.nhle.com": (4, 0.5),
+    "cdn.nba.com": (2, 0.5),
+    "www.oddsportal.com": (1, 1.0),
+    "www.baseball-reference.com": (1, 1.0),
+}
+DEFAULT_HOST_LIMIT = (2, 0.5)
+MAX_WORKERS = 16
+DEFAULT_TIMEOUT = 10
+# Seconds to establish a connection; a host that is down fails on this rather
+# than the full read timeout
+CONNECT_TIMEOUT = 3.05
+# Attempts per request for connection errors, 429s and 5xx responses
+MAX_ATTEMPTS = 3
+# Longest inline wait between attempts; anything longer fails now and is left
+# to the breaker and the next scheduled refresh
+MAX_RETRY_WAIT = 5.0
+RESPONSE_CACHE_SIZE = 256
+RESPONSE_CACHE_TTL = 24 * 60 * 60
+
+
+class HostGate:
+    def __init__(self, max_concurrent, delay):
+        self.delay = delay
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def __enter__(self):
+        self._slots.acquire()
+        # Reserve the next start slot for this host, then wait for it outside the lock
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.delay
+        if start > now:
+            time.sleep(start - now)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._slots.release()
+        return False
+
+
+class CachedResponse:
+    def __init__(self, etag, last_modified, digest, parsed):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.digest = digest
+        self.parsed = parsed
+
+
+_gates = {}
+_breakers = {}
+_gates_lock = threading.Lock()
+_local = threading.local()
+# Optional requests transport adapter (e.g. the benchmark replay adapter);
+# bumping the generation makes every thread remount on its next request
+_transport = None
+_transport_generation = 0
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="fetch")
+_responses = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+_response_stats = {"not_modified": 0, "unchanged": 0, "parsed": 0}
+_stats_lock = threading.Lock()
+
+
+def host_gate(host):
+    with _gates_lock:
+        gate = _gates.get(host)
+        if gate is None:
+            gate = HostGate(*HOST_LIMITS.get(host, DEFAULT_HOST_LIMIT))
+            _gates[host] = gate
+        return gate
+
+
+def host_breaker(host):
+    with _gates_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(host)
+            _breakers[host] = breaker
+        return breaker
+
+
+def reset_host_gates():
+    # Drop the per-host gates and breakers so changes to HOST_LIMITS take effect
+    with _gates_lock:
+        _gates.clear()
+        _breakers.clear()
+
+
+def host_health_stats():
+    with _gates_lock:
+        breakers = list(_breakers.items())
+    return {host: breaker.stats() for host, breaker in breakers}
+
+
+def set_transport(adapter):
+    global _transport, _transport_generation
+    _transport = adapter
+    _transport_generation += 1
+
+
+def get_session():
+    # requests.Session is not thread-safe, so each worker thread keeps its own
+    session = getattr(_local, "session", None)
+    if session is None or getattr(_local, "generation", None) != _transport_generation:
+        session = requests.Session()
+        session.headers.update(HEADERS)
+        if _transport is not None:
+            session.mount("http://", _transport)
+            session.mount("https://", _transport)
+        _local.session = session
+        _local.generation = _transport_generation
+    return session
+
+
+def fetch(url, timeout=DEFAULT_TIMEOUT, **kwargs):
+    # Retries connection errors, 429s and 5xx with jittered exponential backoff
+    # (or the server's Retry-After) while the wait stays short. Timeouts are not
+    # retried inline since each one already cost the full timeout. Raises
+    # HostUnavailable straight away while the host's breaker is open.
+    host = urlparse(url).hostname or ""
+    breaker = host_breaker(host)
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            breaker.before_request()
+        except HostUnavailable:
+            FETCH_TOTAL.inc(host, "circuit_open")
+            raise
+        last_attempt = attempt + 1 == MAX_ATTEMPTS
+        start = time.perf_counter()
+        try:
+            with host_gate(host):
+                res = get_session().get(url, timeout=(CONNECT_TIMEOUT, timeout), **kwargs)
+        except requests.RequestException as e:
+            FETCH_SECONDS.observe(time.perf_counter() - start, host)
+            FETCH_TOTAL.inc(host, type(e).__name__)
+            breaker.record_failure(type(e).__name__)
+            wait = backoff_delay(attempt)
+            if last_attempt or isinstance(e, requests.ReadTimeout) or wait > MAX_RETRY_WAIT:
+                raise
+            time.sleep(wait)
+            continue
+        FETCH_SECONDS.observe(time.perf_counter() - start, host)
+        FETCH_TOTAL.inc(host, f"{res.status_code // 100}xx")
+
+        if res.status_code == 429 or res.status_code >= 500:
+            retry_after = retry_after_seconds(res.headers)
+            breaker.record_failure(f"HTTP {res.status_code}", retry_after)
+            wait = retry_after if retry_after is not None else backoff_delay(attempt)
+            if last_attempt or wait > MAX_RETRY_WAIT:
+                return res
+            time.sleep(wait)
+            continue
+        breaker.record_success()
+        return res
+
+
+def _count(outcome):
+    with _stats_lock:
+        _response_stats[outcome] += 1
+
+
+def fetch_parsed(url, parse, timeout=DEFAULT_TIMEOUT):
+    # Conditional GET with a parsed-result cache: on 304, or a 200 whose body
+    # hashes the same as last time, the previous parse(response) is reused.
+    # parse must not depend on anything but the response, and callers must
+    # treat what it returns as read-only since it is shared between calls.
+    key = (url, parse.__module__, parse.__qualname__)
+    cached = _responses.peek(key)
+    headers = {}
+    if cached is not None:
+        if cached.etag:
+            headers['If-None-Match'] = cached.etag
+        if cached.last_modified:
+            headers['If-Modified-Since'] = cached.last_modified
+
+    res = fetch(url, timeout=timeout, headers=headers)
+    if res.status_code == 304 and cached is not None:
+        _count("not_modified")
+        _responses.set(key, cached)
+        return cached.parsed
+    res.raise_for_status()
+
+    digest = hashlib.sha1(res.content).hexdigest()
+    if cached is not None and cached.digest == digest:
+        _count("unchanged")
+        parsed = cached.parsed
+    else:
+        _count("parsed")
+        with STAGE_SECONDS.time("parse", parse.__qualname__):
+            parsed = parse(res)
+    _responses.set(key, CachedResponse(res.headers.get('ETag'), res.headers.get('Last-Modified'), digest, parsed))
+    return parsed
+
+
+def parse_json(res):
+    return res.json()
+
+
+def clear_response_cache():
+    _responses.clear()
+    with _stats_lock:
+        for outcome in _response_stats:
+            _response_stats[outcome] = 0
+
+
+def response_cache_stats():
+    with _stats_lock:
+        stats = dict(_response_stats)
+    stats.update(_responses.stats())
+    return stats
+
+
+def _run_in_pool(func, args):
+    _local.in_pool = True
+    return func(*args)
+
+
+def run_all(tasks, raise_errors=False):
+    # tasks: list of (callable, args) pairs. Results come back in task order;
+    # each source is expected to handle its own errors and return a list.
+    # With raise_errors the first failure propagates instead of becoming [].
+    if getattr(_local, "in_pool", False):
+        # Already on a pool worker: run inline so nested fan-outs can't
+        # exhaust the pool waiting on each other
+        futures = None
+    else:
+        futures = [_executor.submit(_run_in_pool, func, args) for func, args in tasks]
+    results = []
+    for i, (func, args) in enumerate(tasks):
+        try:
+            results.append(futures[i].result() if futures else func(*args))
+        except Exception as e:
+            if raise_errors:
+                raise
+            print(f"Error in {getattr(func, '__name__', func)}{args}: {e}")
+            results.append([])
+    return results
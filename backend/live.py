@@ -0,0 +1,156 @@
+import asyncio
+import os
+import threading
+from collections import deque
+from datetime import date
+from responses import dumps
+
+# Server-sent events for live scores. After each background re-scrape the
+# new snapshot is diffed against the previous one and only the changed
+# records are pushed. A diff is encoded once and the same bytes are fanned
+# out to every connected client.
+
+# Seconds between keep-alive comments on an idle stream
+KEEPALIVE = 15
+
+# Tells the client to drop its state and reconnect for a fresh snapshot
+RESYNC = b"event: resync\ndata: {}\n\n"
+
+
+def record_key(m):
+    return (m.sport, m.league, m.date, m.home_team, m.away_team)
+
+
+def diff_records(old, new):
+    # (changed or added records, removed records)
+    before = {record_key(r): r for r in old or ()}
+    changed = []
+    for r in new:
+        previous = before.pop(record_key(r), None)
+        if previous != r:
+            changed.append(r)
+    return changed, list(before.values())
+
+
+class Subscriber:
+    def __init__(self, loop, sport=None, maxsize=64):
+        self.loop = loop
+        self.sport = sport.lower() if sport else None
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.needs_resync = False
+
+    def wants(self, sport):
+        return self.sport is None or self.sport == sport
+
+    def offer(self, message):
+        # Runs on the subscriber's event loop. A client too slow to keep up
+        # is told to resync rather than buffered without bound
+        if self.needs_resync:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.needs_resync = True
+
+
+class Broadcaster:
+    # Event IDs are "<token>-<n>". Each API worker publishes and keeps
+    # history on its own, so the token (random per process) lets a worker
+    # recognise a Last-Event-ID that another worker, or an earlier run of
+    # this one, issued and answer it with a resync instead of wrong events.
+    def __init__(self, history=256):
+        self._subscribers = set()
+        self._history = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self.token = os.urandom(4).hex()
+
+    def publish(self, event, sport, payload):
+        # Thread-safe; called from the refresh workers
+        data = dumps(payload)
+        with self._lock:
+            event_id = self._next_id
+            self._next_id += 1
+            message = b"id: %s-%d\nevent: %s\ndata: %s\n\n" % (self.token.encode(), event_id, event.encode(),
+                                                                 data)
+            self._history.append((event_id, sport, message))
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            if subscriber.wants(sport):
+                subscriber.loop.call_soon_threadsafe(subscriber.offer, message)
+
+    def subscribe(self, sport=None, last_event_id=None):
+        subscriber = Subscriber(asyncio.get_running_loop(), sport)
+        with self._lock:
+            self._subscribers.add(subscriber)
+            # A reconnecting EventSource sends Last-Event-ID; replay what it
+            # missed, or have it resync when that can't be done from here
+            if last_event_id is not None and not self._replay(subscriber, last_event_id):
+                subscriber.needs_resync = True
+        return subscriber
+
+    def _replay(self, subscriber, last_event_id):
+        # Caller holds self._lock. False for IDs from another worker or run,
+        # and for ones older than the history still kept.
+        token, _, seen = last_event_id.rpartition("-")
+        if token != self.token or not seen.isdigit():
+            return False
+        seen, last = int(seen), self._next_id - 1
+        oldest = self._history[0][0] if self._history else last + 1
+        if seen > last or seen < oldest - 1:
+            return False
+        for event_id, event_sport, message in self._history:
+            if event_id > seen and subscriber.wants(event_sport):
+                subscriber.offer(message)
+        return True
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def stats(self):
+        with self._lock:
+            last = self._next_id - 1
+            return {"subscribers": len(self._subscribers),
+                    "last_event_id": f"{self.token}-{last}" if last else None}
+
+    async def stream(self, subscriber, initial=None):
+        # initial: bytes sent before any diff, e.g. the current snapshot
+        try:
+            if initial is not None:
+                yield initial
+            while not subscriber.needs_resync:
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                # Queued diffs are moot once the client has to reload anyway
+                if not subscriber.needs_resync:
+                    yield message
+            yield RESYNC
+        finally:
+            self.unsubscribe(subscriber)
+
+
+def score_diff_listener(broadcaster):
+    # RefreshScheduler listener publishing a "diff" event per changed scores
+    # source. /scores/live streams today's scores, so other dates' keys
+    # (kept fresh for /scores?date=) are not published.
+    def listener(name, args, previous, data):
+        if name != "scores" or previous is None:
+            return
+        sport, league, date_str = args
+        if date_str != date.today().isoformat():
+            return
+        changed, removed = diff_records(previous, data)
+        if not changed and not removed:
+            return
+        broadcaster.publish("diff", sport.lower(), {
+            "sport": sport,
+            "league": league,
+            "date": date_str,
+            "changed": [m.to_dict() for m in changed],
+            "removed": [m.to_dict() for m in removed],
+        })
+    return listener
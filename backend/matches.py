@@ -0,0 +1,113 @@
+import threading
+from entities import match_id
+from records import Fixture, JoinedMatch, Prediction
+
+# The joined "match" view behind /matches: each game's fixture, score and
+# prediction under one canonical match ID. Sources are applied one snapshot
+# list at a time; an unchanged list (same object) is skipped, and a changed
+# one only replaces what that source contributed before, so a refresh of one
+# league touches that league's games and nothing else.
+
+
+class MatchIndex:
+    def __init__(self):
+        # source key -> (records list, match IDs or prediction pairs it added)
+        self.sources = {}
+        # match ID -> {"fixture" | "result": {source key: record}}
+        self.entries = {}
+        # (sport, home ID, away ID) -> {source key: Prediction}
+        self.predictions = {}
+        self.version = 0
+        self._model_sources = set()
+        self._built = None
+        self._lock = threading.Lock()
+
+    def update(self, parts, model_sources=()):
+        # parts: {source key: records}. Sources missing from parts are
+        # dropped. Predictions from model_sources are only used for games no
+        # scraped odds source has a prediction for; no placeholder rows are
+        # registered as sources, so anything else here is real odds.
+        with self._lock:
+            self._model_sources = set(model_sources)
+            changed = False
+            for key in [k for k in self.sources if k not in parts]:
+                self._remove(key)
+                changed = True
+            for key, records in parts.items():
+                current = self.sources.get(key)
+                if current is not None and current[0] is records:
+                    continue
+                if current is not None:
+                    self._remove(key)
+                self._add(key, records)
+                changed = True
+            if changed:
+                self.version += 1
+
+    def _add(self, key, records):
+        added = []
+        for r in records:
+            home_id, away_id = r.home_id, r.away_id
+            if home_id is None or away_id is None:
+                continue
+            if isinstance(r, Prediction):
+                pair = (r.sport, home_id, away_id)
+                self.predictions.setdefault(pair, {})[key] = r
+                added.append(pair)
+            else:
+                mid = match_id(r.sport, r.date, home_id, away_id)
+                slot = "fixture" if isinstance(r, Fixture) else "result"
+                self.entries.setdefault(mid, {}).setdefault(slot, {})[key] = r
+                added.append(mid)
+        self.sources[key] = (records, added)
+
+    def _remove(self, key):
+        _, added = self.sources.pop(key)
+        for ref in added:
+            table = self.predictions if isinstance(ref, tuple) else self.entries
+            entry = table.get(ref)
+            if entry is None:
+                continue
+            if table is self.predictions:
+                entry.pop(key, None)
+            else:
+                for slot in list(entry):
+                    entry[slot].pop(key, None)
+                    if not entry[slot]:
+                        del entry[slot]
+            if not entry:
+                del table[ref]
+
+    def _prediction(self, sport, home_id, away_id):
+        by_source = self.predictions.get((sport, home_id, away_id))
+        if not by_source:
+            return None
+        scraped = [p for key, p in by_source.items() if key not in self._model_sources]
+        return scraped[0] if scraped else next(iter(by_source.values()))
+
+    def records(self):
+        # JoinedMatch list, rebuilt only after a source changed; the same
+        # list object is returned until then, so views keyed on it stay put
+        with self._lock:
+            if self._built is not None and self._built[0] == self.version:
+                return self._built[1]
+            joined = []
+            for mid, entry in self.entries.items():
+                fixture = next(iter(entry["fixture"].values())) if "fixture" in entry else None
+                result = next(iter(entry["result"].values())) if "result" in entry else None
+                base = fixture or result
+                joined.append(JoinedMatch(mid, base.sport, base.league, base.date,
+                                          fixture.time if fixture else None, base.home_team, base.away_team,
+                                          fixture, result, self._prediction(base.sport, base.home_id, base.away_id)))
+            by_id = {m.match_id: m for m in joined}
+            self._built = (self.version, joined, by_id)
+            return joined
+
+    def get(self, mid):
+        self.records()
+        return self._built[2].get(mid)
+
+    def stats(self):
+        with self._lock:
+            return {"sources": len(self.sources), "matches": len(self.entries),
+                    "predicted_pairs": len(self.predictions), "version": self.version}
@@ -0,0 +1,248 @@
+import threading
+from collections import OrderedDict
+from datetime import date
+from records import Prediction
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; without it there are no model predictions
+    np = None
+
+# Win/draw/loss probabilities from the scores the scrapers already collect,
+# so predictions don't depend on an odds site being up. Each (sport, league)
+# keeps time-weighted goals for and against per team, at home and away;
+# attack and defence ratings relative to the league average give every
+# fixture's expected goals, and independent Poisson scorelines (with the
+# Dixon-Coles low-score correction for soccer) give the outcome odds. All of
+# it is array arithmetic over every team and fixture of a league at once, and
+# new or corrected results are folded in as they arrive.
+
+# A result's weight halves every HALF_LIFE_DAYS, so recent form counts most
+HALF_LIFE_DAYS = 180.0
+_EPOCH = date(2020, 1, 1)
+# Ratings are shrunk toward the league average as if every team had also
+# played this many average matches, so a team with two results isn't extreme
+PRIOR_MATCHES = 3.0
+# Fixtures where either team has fewer results than this get no prediction;
+# the prior alone would just call them even
+MIN_RESULTS = 3
+# Scorelines beyond this are negligible even for baseball
+MAX_GOALS = 25
+# Dixon-Coles dependence between low scores (0-0, 1-0, 0-1, 1-1); a typical
+# fitted value for top-flight soccer, not refitted here
+DIXON_COLES_RHO = -0.05
+# Sports where a draw is a final result; elsewhere (extra time, shootouts,
+# extra innings) the draw mass is split by each side's chance of winning
+DRAW_SPORTS = {"Soccer"}
+# Fixture lists whose predictions are kept: one per fixtures view in use
+# (/predictions and each /matches window)
+MEMO_SIZE = 8
+
+
+def result_weight(day):
+    # Grows with time instead of decaying old results: ratings are ratios of
+    # weighted sums, so only relative weights matter and nothing is rescaled
+    return 2.0 ** ((day - _EPOCH).days / HALF_LIFE_DAYS)
+
+
+def outcome_probabilities(home_goals, away_goals, rho=0.0):
+    # Expected goals arrays -> (home win, draw, away win) arrays
+    goals = np.arange(MAX_GOALS + 1)
+    log_factorial = np.concatenate(([0.0], np.cumsum(np.log(goals[1:]))))
+
+    def pmf(rate):
+        return np.exp(goals * np.log(rate)[:, None] - rate[:, None] - log_factorial)
+
+    # grid[n, i, j]: probability fixture n ends i-j
+    grid = pmf(home_goals)[:, :, None] * pmf(away_goals)[:, None, :]
+    if rho:
+        grid[:, 0, 0] *= 1 - home_goals * away_goals * rho
+        grid[:, 0, 1] *= 1 + home_goals * rho
+        grid[:, 1, 0] *= 1 + away_goals * rho
+        grid[:, 1, 1] *= 1 - rho
+    home = np.tril(grid, -1).sum(axis=(1, 2))
+    draw = np.trace(grid, axis1=1, axis2=2)
+    away = np.triu(grid, 1).sum(axis=(1, 2))
+    total = home + draw + away
+    return home / total, draw / total, away / total
+
+
+class LeagueTable:
+    def __init__(self):
+        self.teams = {}
+        # Per team: weighted goals scored, goals conceded, total weight and
+        # number of results, at home and away
+        self.home = np.zeros((0, 4))
+        self.away = np.zeros((0, 4))
+        self.latest_weight = 0.0
+
+    def indexes(self, team_ids, add=False):
+        # Team IDs -> row indexes; unknown teams are -1 unless added
+        if add:
+            for tid in team_ids:
+                self.teams.setdefault(tid, len(self.teams))
+            grow = len(self.teams) - len(self.home)
+            if grow > 0:
+                self.home = np.vstack([self.home, np.zeros((grow, 4))])
+                self.away = np.vstack([self.away, np.zeros((grow, 4))])
+        return np.array([self.teams.get(tid, -1) for tid in team_ids], dtype=int)
+
+    def add(self, home_idx, away_idx, home_goals, away_goals, weights):
+        # Negative weights take a result back out
+        counts = np.sign(weights)
+        np.add.at(self.home, home_idx, np.column_stack([home_goals * weights, away_goals * weights, weights, counts]))
+        np.add.at(self.away, away_idx, np.column_stack([away_goals * weights, home_goals * weights, weights, counts]))
+
+    def results(self, idx):
+        # Results per team, home and away together; 0 for unknown teams
+        counts = self.home[:, 3] + self.away[:, 3]
+        return np.where(idx >= 0, counts[np.maximum(idx, 0)], 0)
+
+    def expected_goals(self, home_idx, away_idx):
+        home_total = self.home.sum(axis=0)
+        away_total = self.away.sum(axis=0)
+        if home_total[2] <= 0 or away_total[2] <= 0:
+            return None
+        # League average goals per match for the home and the away side
+        home_avg = max(home_total[0] / home_total[2], 0.05)
+        away_avg = max(away_total[0] / away_total[2], 0.05)
+        prior = PRIOR_MATCHES * self.latest_weight
+
+        home_attack = (self.home[:, 0] + prior * home_avg) / (self.home[:, 2] + prior) / home_avg
+        home_defence = (self.home[:, 1] + prior * away_avg) / (self.home[:, 2] + prior) / away_avg
+        away_attack = (self.away[:, 0] + prior * away_avg) / (self.away[:, 2] + prior) / away_avg
+        away_defence = (self.away[:, 1] + prior * home_avg) / (self.away[:, 2] + prior) / home_avg
+
+        def rating(ratings, idx):
+            # Teams without results rate as league average
+            return np.where(idx >= 0, ratings[np.maximum(idx, 0)], 1.0)
+
+        home_goals = home_avg * rating(home_attack, home_idx) * rating(away_defence, away_idx)
+        away_goals = away_avg * rating(away_attack, away_idx) * rating(home_defence, home_idx)
+        return np.maximum(home_goals, 0.05), np.maximum(away_goals, 0.05)
+
+
+class TeamStrengthModel:
+    def __init__(self):
+        self.tables = {}
+        # record key -> the (goals, weight) it contributed, so a corrected or
+        # still-running score replaces its earlier contribution
+        self.results = {}
+        self.version = 0
+        # id(fixtures) -> (fixtures, model version, predictions)
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+        self._memo_lock = threading.Lock()
+
+    @staticmethod
+    def available():
+        return np is not None
+
+    def update(self, matches):
+        # Folds in results with both scores and a date; returns how many
+        # were new or changed
+        if np is None:
+            return 0
+        batches = {}
+        changed = 0
+        with self._lock:
+            for m in matches:
+                if m.home_score is None or m.away_score is None or m.date is None or not m.home_team \
+                        or not m.away_team:
+                    continue
+                home_id, away_id = m.home_id, m.away_id
+                key = (m.sport, m.league_id, m.date, home_id, away_id)
+                result = (m.home_score, m.away_score, result_weight(m.date))
+                previous = self.results.get(key)
+                if previous == result:
+                    continue
+                self.results[key] = result
+                changed += 1
+                batch = batches.setdefault((m.sport, m.league_id), [])
+                if previous is not None:
+                    batch.append((home_id, away_id, previous[0], previous[1], -previous[2]))
+                batch.append((home_id, away_id) + result)
+
+            for league_key, rows in batches.items():
+                table = self.tables.get(league_key)
+                if table is None:
+                    table = self.tables[league_key] = LeagueTable()
+                home_teams, away_teams, home_goals, away_goals, weights = zip(*rows)
+                weights = np.array(weights, dtype=float)
+                table.add(table.indexes(home_teams, add=True), table.indexes(away_teams, add=True),
+                          np.array(home_goals, dtype=float), np.array(away_goals, dtype=float), weights)
+                table.latest_weight = max(table.latest_weight, weights.max())
+            if changed:
+                self.version += 1
+        return changed
+
+    def listener(self, name, args, previous, data):
+        # RefreshScheduler listener: every new scores snapshot, dated or a
+        # season/range one, updates the model
+        if name in ("scores", "score_ranges"):
+            self.update(data)
+
+    def predict(self, fixtures):
+        # Predictions for the fixtures whose league has results, in input order
+        if np is None:
+            return []
+        by_league = {}
+        for i, f in enumerate(fixtures):
+            if f.home_team and f.away_team:
+                by_league.setdefault((f.sport, f.league_id), []).append(i)
+
+        predictions = {}
+        with self._lock:
+            for (sport, lid), positions in by_league.items():
+                table = self.tables.get((sport, lid))
+                if table is None:
+                    continue
+                rows = [fixtures[i] for i in positions]
+                home_idx = table.indexes([f.home_id for f in rows])
+                away_idx = table.indexes([f.away_id for f in rows])
+                known = (table.results(home_idx) >= MIN_RESULTS) & (table.results(away_idx) >= MIN_RESULTS)
+                if not known.any():
+                    continue
+                positions = [i for i, k in zip(positions, known) if k]
+                rows = [fixtures[i] for i in positions]
+                goals = table.expected_goals(home_idx[known], away_idx[known])
+                if goals is None:
+                    continue
+                draws = sport in DRAW_SPORTS
+                home, draw, away = outcome_probabilities(*goals, rho=DIXON_COLES_RHO if draws else 0.0)
+                if not draws:
+                    home, away = home / (home + away), away / (home + away)
+                for n, (i, f) in enumerate(zip(positions, rows)):
+                    predictions[i] = Prediction(sport, f.league, f.home_team, f.away_team,
+                                                round(100 * float(home[n]), 1),
+                                                round(100 * float(draw[n]), 1) if draws else None,
+                                                round(100 * float(away[n]), 1))
+        return [predictions[i] for i in sorted(predictions)]
+
+    def predict_cached(self, fixtures):
+        # predict(), reusing the result for this fixtures list while neither
+        # it nor the model has changed. Each list keeps its own entry, so
+        # callers alternating between views don't recompute each other's.
+        with self._memo_lock:
+            memo = self._memo.get(id(fixtures))
+            if memo is not None and memo[0] is fixtures and memo[1] == self.version:
+                self._memo.move_to_end(id(fixtures))
+                return memo[2]
+        version = self.version
+        predictions = self.predict(fixtures)
+        with self._memo_lock:
+            self._memo[id(fixtures)] = (fixtures, version, predictions)
+            self._memo.move_to_end(id(fixtures))
+            while len(self._memo) > MEMO_SIZE:
+                self._memo.popitem(last=False)
+        return predictions
+
+    def stats(self):
+        with self._lock:
+            return {
+                "available": np is not None,
+                "leagues": len(self.tables),
+                "teams": sum(len(t.teams) for t in self.tables.values()),
+                "results": len(self.results),
+                "version": self.version,
+            }
@@ -0,0 +1,149 @@
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from lxml import html as lxml_html
+except ImportError:  # lxml is optional; fall back to BeautifulSoup's html.parser
+    lxml_html = None
+
+# Fast table extraction for the FBref and ESPN pages. Only the target table
+# markup is parsed: it is sliced out of the page first, then handed to lxml
+# when installed or to a SoupStrainer-restricted html.parser otherwise. Each
+# row's cells are read in a single pass.
+
+
+def _slice(text, start_marker, end_marker="</table>", last=False):
+    # Cut the page down to the region holding the target table(s); returns
+    # None when the markers aren't found so callers parse the whole page
+    marker = text.find(start_marker)
+    if marker == -1:
+        return None
+    start = text.rfind("<table", 0, marker + 1)
+    end = text.rfind(end_marker) if last else text.find(end_marker, marker)
+    if start == -1 or end == -1:
+        return None
+    return text[start:end + len(end_marker)]
+
+
+def _has_class(el, cls):
+    return cls in (el.get("class") or "").split()
+
+
+def fbref_schedule_rows(text):
+    # (date, home, away, score) for every row of table#sched_all
+    if lxml_html is None:
+        return _fbref_schedule_rows_bs4(text)
+
+    fragment = _slice(text, 'id="sched_all"')
+    doc = lxml_html.fromstring(fragment or text)
+    tables = [doc] if fragment and doc.tag == "table" else doc.xpath('//table[@id="sched_all"]')
+    if not tables:
+        return []
+    tbody = tables[0].find(".//tbody")
+    if tbody is None:
+        return []
+
+    rows_out = []
+    for row in tbody.iter("tr"):
+        classes = (row.get("class") or "").split()
+        if "thead" in classes or "over_header" in classes:
+            continue
+        cells = {}
+        for cell in row.iterchildren("td"):
+            stat = cell.get("data-stat")
+            if stat in ("date", "home_team", "away_team", "score") and stat not in cells:
+                cells[stat] = cell.text_content().strip()
+        match_date = cells.get("date")
+        home = cells.get("home_team")
+        away = cells.get("away_team")
+        if home and away and match_date:
+            rows_out.append((match_date, home, away, cells.get("score", "TBD")))
+    return rows_out
+
+
+def _fbref_schedule_rows_bs4(text):
+    fragment = _slice(text, 'id="sched_all"')
+    soup = BeautifulSoup(fragment or text, "html.parser", parse_only=SoupStrainer("table", id="sched_all"))
+    table = soup.find("table", id="sched_all")
+    tbody = table.find("tbody") if table else None
+    if tbody is None:
+        return []
+
+    rows_out = []
+    for row in tbody.find_all("tr"):
+        if any(cls in row.get("class", []) for cls in ["thead", "over_header"]):
+            continue
+        cells = {}
+        for cell in row.find_all("td", recursive=False):
+            stat = cell.get("data-stat")
+            if stat in ("date", "home_team", "away_team", "score") and stat not in cells:
+                cells[stat] = cell.get_text().strip()
+        match_date = cells.get("date")
+        home = cells.get("home_team")
+        away = cells.get("away_team")
+        if home and away and match_date:
+            rows_out.append((match_date, home, away, cells.get("score", "TBD")))
+    return rows_out
+
+
+def espn_fixture_rows(text):
+    # (date heading text or None, time, home, away) for every fixture row
+    if lxml_html is None:
+        return _espn_fixture_rows_bs4(text)
+
+    fragment = _slice(text, '<table class="Table', last=True)
+    doc = lxml_html.fromstring("<div>" + fragment + "</div>" if fragment else text)
+    tables = doc.xpath('//table[contains(concat(" ", normalize-space(@class), " "), " Table ")]')
+
+    rows_out = []
+    date_text = None
+    for table in tables:
+        for row in table.iter("tr"):
+            classes = (row.get("class") or "").split()
+            if "Table__TR" not in classes or "Table__header" in classes:
+                continue
+            if "Table__sub-header" in classes:
+                date_text = row.text_content().strip()
+                continue
+
+            # One walk over the row collects the first two team links and the time cell
+            teams = []
+            match_time = None
+            for el in row.iter("a", "td"):
+                if el.tag == "a":
+                    if len(teams) < 2 and _has_class(el, "AnchorLink"):
+                        teams.append(el)
+                elif match_time is None and _has_class(el, "date__col"):
+                    match_time = el.text_content().strip()
+            if len(teams) >= 2:
+                rows_out.append((date_text, match_time if match_time is not None else "TBD",
+                                 teams[0].text_content().strip(), teams[1].text_content().strip()))
+    return rows_out
+
+
+def _espn_fixture_rows_bs4(text):
+    fragment = _slice(text, '<table class="Table', last=True)
+    soup = BeautifulSoup(fragment or text, "html.parser", parse_only=SoupStrainer("table", class_="Table"))
+
+    rows_out = []
+    date_text = None
+    for table in soup.find_all("table", class_="Table"):
+        for row in table.find_all("tr", class_="Table__TR"):
+            classes = row.get("class", [])
+            if "Table__header" in classes:
+                continue
+            if "Table__sub-header" in classes:
+                date_text = row.get_text().strip()
+                continue
+
+            teams = []
+            match_time = None
+            for el in row.find_all(["a", "td"]):
+                if el.name == "a":
+                    if len(teams) < 2 and "AnchorLink" in el.get("class", []):
+                        teams.append(el)
+                elif match_time is None and "date__col" in el.get("class", []):
+                    match_time = el.get_text().strip()
+            if len(teams) >= 2:
+                rows_out.append((date_text, match_time if match_time is not None else "TBD",
+                                 teams[0].get_text().strip(), teams[1].get_text().strip()))
+    return rows_out
@@ -0,0 +1,140 @@
+import cProfile
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from urllib.parse import parse_qs
+
+# Opt-in profiling for one scrape run or one API request. Nothing here runs
+# unless asked for, via --profile on the scraper CLIs or MKSPORTS_PROFILE:
+#   sample   - wall-clock stack sampler over every thread (the fetch pool
+#              included); writes collapsed stacks (.folded) for flamegraph.pl,
+#              speedscope or inferno
+#   cprofile - deterministic cProfile of the calling thread; writes a .prof
+#              for snakeviz/pstats
+# Files go to MKSPORTS_PROFILE_DIR (default: ./profiles). With MKSPORTS_PROFILE
+# set, the API also profiles any request carrying ?profile=1 (dev mode only).
+
+PROFILE_MODES = ("sample", "cprofile")
+SAMPLE_INTERVAL = 0.005
+
+# Innermost frames of a thread that is parked, e.g. an idle pool worker
+_IDLE_FRAMES = {("threading.py", "wait"), ("queue.py", "get"), ("selectors.py", "select"),
+                ("threading.py", "_wait_for_tstate_lock"), ("thread.py", "_worker")}
+
+
+def profile_mode(mode=None):
+    mode = mode or os.environ.get("MKSPORTS_PROFILE", "").strip().lower()
+    if mode in ("1", "true", "yes"):
+        mode = "sample"
+    return mode if mode in PROFILE_MODES else None
+
+
+def profile_path(name, extension):
+    directory = os.environ.get("MKSPORTS_PROFILE_DIR", "profiles")
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in name)
+    return os.path.join(directory, f"{safe}-{stamp}-{os.getpid()}.{extension}")
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        own = threading.get_ident()
+        # Pool threads ("fetch_3", "refresh_0") share one root per pool
+        names = {t.ident: t.name.rstrip("0123456789").rstrip("_") or t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            code = frame.f_code
+            if (os.path.basename(code.co_filename), code.co_name) in _IDLE_FRAMES:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            labels.append(names.get(ident, str(ident)))
+            self.stacks[";".join(reversed(labels))] += 1
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name="profile-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+@contextmanager
+def profiled(name, mode=None):
+    # Profiles the with-block when mode (or MKSPORTS_PROFILE) asks for it.
+    # Yields a dict whose "path" is set to the output file on exit.
+    mode = profile_mode(mode)
+    result = {"path": None}
+    if mode is None:
+        yield result
+        return
+
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield result
+        finally:
+            profiler.disable()
+            result["path"] = profile_path(name, "prof")
+            profiler.dump_stats(result["path"])
+            print(f"Profile for {name} written to {result['path']}")
+    else:
+        sampler = StackSampler()
+        sampler.start()
+        try:
+            yield result
+        finally:
+            sampler.stop()
+            result["path"] = profile_path(name, "folded")
+            sampler.write(result["path"])
+            print(f"Profile for {name} written to {result['path']}")
+
+
+def add_profile_argument(parser):
+    parser.add_argument("--profile", nargs="?", const="sample", choices=PROFILE_MODES,
+                        help="profile the run (default mode: sample) and write the result to "
+                             "MKSPORTS_PROFILE_DIR")
+
+
+class ProfileRequestMiddleware:
+    # Installed by the API only when MKSPORTS_PROFILE is set. Always samples:
+    # store lookups, view builds and scrapes run on worker threads, out of
+    # reach of a cProfile started on the event loop thread
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or "profile" not in parse_qs(scope.get("query_string", b"").decode()):
+            await self.app(scope, receive, send)
+            return
+        with profiled(f"request{scope['path'].replace('/', '_')}", "sample"):
+            await self.app(scope, receive, send)
@@ -0,0 +1,264 @@
+import re
+from dataclasses import dataclass
+from typing import ClassVar
+from datetime import date, datetime, time
+from entities import league_id, normalize_league, team_id
+
+# Compact typed records shared by the scrapers and the API. Scores, times and
+# probabilities are kept numeric; to_dict() renders the string forms the JSON
+# API has always returned ("2-1", "20:00", "45.1%") only at serialization.
+
+_SCORE = re.compile(r"^\s*(\d+)\s*[-–—:]\s*(\d+)\s*$")
+
+
+def parse_date(value):
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return None
+
+
+_league_matches = {}
+
+
+def league_matches(query, league):
+    # Same loose matching the league routes always had: "premier" finds
+    # "Premier League"; aliases and separators are normalized first. The
+    # answer is remembered, so repeat filters are a dict lookup.
+    key = (query, league)
+    matched = _league_matches.get(key)
+    if matched is None:
+        if len(_league_matches) > 4096:
+            _league_matches.clear()
+        matched = _league_matches[key] = normalize_league(query) in normalize_league(league)
+    return matched
+
+
+def parse_time(value):
+    # "20:00", "2025-06-01T20:05:00Z" or "2:30 PM" -> time; anything else
+    # (LIVE, TBD, FT) -> None so the caller keeps the label
+    if isinstance(value, time):
+        return value
+    if not value:
+        return None
+    text = (value.split("T")[1] if "T" in value else value).strip()
+    # 12-hour ESPN times are read whole; only ISO/24-hour values are cut
+    # to HH:MM, or "10:30 PM" would come back as 10:30
+    if text[-2:].upper() in ("AM", "PM"):
+        fmt = "%I:%M %p"
+    else:
+        fmt, text = "%H:%M", text[:5]
+    try:
+        return datetime.strptime(text, fmt).time()
+    except ValueError:
+        return None
+
+
+def parse_score(text):
+    # "2-1" / "2–1" -> (2, 1); anything else -> (None, None)
+    match = _SCORE.match(text or "")
+    if not match:
+        return None, None
+    return int(match.group(1)), int(match.group(2))
+
+
+def parse_prob(text):
+    # "45.1%" / "45" -> 45.1; "N/A", "-", None -> None
+    if text is None:
+        return None
+    if isinstance(text, (int, float)):
+        return float(text)
+    try:
+        return float(str(text).strip().rstrip("%"))
+    except ValueError:
+        return None
+
+
+def format_prob(value):
+    # 45.0 -> "45.0%": one decimal, as the odds-derived strings always had
+    return None if value is None else f"{value:.1f}%"
+
+
+class TeamRecord:
+    # Canonical league and team IDs (see entities.py) for joins and filters
+    __slots__ = ()
+
+    @property
+    def league_id(self):
+        return league_id(self.league)
+
+    @property
+    def home_id(self):
+        return team_id(self.sport, self.home_team)
+
+    @property
+    def away_id(self):
+        return team_id(self.sport, self.away_team)
+
+
+@dataclass(slots=True)
+class Match(TeamRecord):
+    sport: str
+    league: str
+    date: date | None
+    home_team: str | None
+    away_team: str | None
+    home_score: int | None = None
+    away_score: int | None = None
+    # Shown instead of the score when there is none: "TBD", "No games scheduled", errors
+    note: str | None = "TBD"
+
+    # Keys of to_dict(), the names accepted by ?fields=
+    FIELDS: ClassVar[tuple] = ("sport", "league", "date", "home_team", "away_team", "score")
+
+    @property
+    def score(self):
+        if self.home_score is not None and self.away_score is not None:
+            return f"{self.home_score}-{self.away_score}"
+        return self.note
+
+    def to_dict(self):
+        return {
+            "sport": self.sport,
+            "league": self.league,
+            "date": self.date.isoformat() if self.date else None,
+            "home_team": self.home_team,
+            "away_team": self.away_team,
+            "score": self.score,
+        }
+
+    @classmethod
+    def from_score_text(cls, sport, league, match_date, home_team, away_team, score):
+        home_score, away_score = parse_score(score)
+        note = None if home_score is not None else score
+        return cls(sport, league, parse_date(match_date), home_team, away_team, home_score, away_score, note)
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls.from_score_text(d.get("sport"), d.get("league"), d.get("date"),
+                                   d.get("home_team"), d.get("away_team"), d.get("score"))
+
+
+@dataclass(slots=True)
+class Fixture(TeamRecord):
+    sport: str
+    league: str
+    date: date | None
+    time: time | None
+    home_team: str | None
+    away_team: str | None
+    status: str = "Upcoming"
+    # Original time text when it isn't a clock time ("LIVE", "TBD")
+    time_label: str | None = None
+    note: str | None = None
+
+    FIELDS: ClassVar[tuple] = ("sport", "league", "date", "time", "home_team", "away_team", "status", "note")
+
+    def to_dict(self):
+        d = {
+            "sport": self.sport,
+            "league": self.league,
+            "date": self.date.isoformat() if self.date else None,
+            "time": self.time.strftime("%H:%M") if self.time else (self.time_label or "TBD"),
+            "home_team": self.home_team,
+            "away_team": self.away_team,
+            "status": self.status,
+        }
+        if self.note:
+            d["note"] = self.note
+        return d
+
+    @classmethod
+    def from_time_text(cls, sport, league, fixture_date, time_text, home_team, away_team,
+                       status="Upcoming", note=None):
+        parsed = parse_time(time_text)
+        return cls(sport, league, parse_date(fixture_date), parsed, home_team, away_team, status,
+                   None if parsed else time_text, note)
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls.from_time_text(d.get("sport"), d.get("league"), d.get("date"), d.get("time"),
+                                  d.get("home_team"), d.get("away_team"), d.get("status", "Upcoming"),
+                                  d.get("note"))
+
+
+@dataclass(slots=True)
+class Prediction(TeamRecord):
+    sport: str
+    league: str
+    home_team: str | None
+    away_team: str | None
+    # Percentages (45.1 == 45.1%); None when unavailable or not applicable
+    home_win_prob: float | None
+    draw_prob: float | None
+    away_win_prob: float | None
+
+    FIELDS: ClassVar[tuple] = ("sport", "league", "home_team", "away_team", "home_win_prob", "draw_prob",
+                               "away_win_prob")
+
+    def to_dict(self):
+        # Missing win probabilities render as "N/A"; a missing draw is null
+        # except in soccer, where a draw is always a possible outcome
+        return {
+            "sport": self.sport,
+            "league": self.league,
+            "home_team": self.home_team,
+            "away_team": self.away_team,
+            "home_win_prob": format_prob(self.home_win_prob) or "N/A",
+            "draw_prob": format_prob(self.draw_prob) or ("N/A" if self.sport == "Soccer" else None),
+            "away_win_prob": format_prob(self.away_win_prob) or "N/A",
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d.get("sport"), d.get("league"), d.get("home_team"), d.get("away_team"),
+                   parse_prob(d.get("home_win_prob")), parse_prob(d.get("draw_prob")),
+                   parse_prob(d.get("away_win_prob")))
+
+
+@dataclass(slots=True)
+class JoinedMatch(TeamRecord):
+    # One game across the datasets: its fixture, its live or final score and
+    # a prediction, any of which may be missing
+    match_id: str
+    sport: str
+    league: str
+    date: date | None
+    time: time | None
+    home_team: str
+    away_team: str
+    fixture: Fixture | None = None
+    result: Match | None = None
+    prediction: Prediction | None = None
+
+    FIELDS: ClassVar[tuple] = ("match_id", "sport", "league", "date", "time", "home_team", "away_team", "status",
+                               "score", "home_win_prob", "draw_prob", "away_win_prob")
+
+    def to_dict(self):
+        prediction = self.prediction.to_dict() if self.prediction else {}
+        return {
+            "match_id": self.match_id,
+            "sport": self.sport,
+            "league": self.league,
+            "date": self.date.isoformat() if self.date else None,
+            "time": self.fixture.to_dict()["time"] if self.fixture else None,
+            "home_team": self.home_team,
+            "away_team": self.away_team,
+            "status": self.fixture.status if self.fixture else None,
+            "score": self.result.score if self.result else None,
+            "home_win_prob": prediction.get("home_win_prob"),
+            "draw_prob": prediction.get("draw_prob"),
+            "away_win_prob": prediction.get("away_win_prob"),
+        }
+
+
+def project(record, fields=None):
+    # to_dict() cut down to ?fields=; "note" is optional on fixtures, hence .get()
+    d = record.to_dict()
+    return d if fields is None else {f: d.get(f) for f in fields}
+
+
+def to_dicts(records, fields=None):
+    return [project(r, fields) for r in records]
@@ -0,0 +1,113 @@
+import base64
+import gzip
+import hashlib
+import json
+from fastapi.responses import Response, StreamingResponse
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder is the fallback
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip covers every browser
+    brotli = None
+
+# Pre-encoded JSON bodies for the read endpoints. A body is serialized and
+# compressed once per view, tagged with a content-hash ETag, and then handed
+# out as-is: repeat requests carrying the ETag get a 304, fresh ones get the
+# stored bytes in the best encoding the client accepts.
+
+# Bodies smaller than this aren't worth compressing
+MIN_COMPRESS_SIZE = 1024
+
+# Records per chunk written by NDJSON streams
+NDJSON_CHUNK = 256
+
+
+def dumps(content):
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class EncodedBody:
+    __slots__ = ("identity", "gzip", "br", "etag")
+
+    def __init__(self, content):
+        self.identity = dumps(content)
+        self.etag = '"' + hashlib.blake2b(self.identity, digest_size=16).hexdigest() + '"'
+        large = len(self.identity) >= MIN_COMPRESS_SIZE
+        self.gzip = gzip.compress(self.identity, compresslevel=6, mtime=0) if large else None
+        self.br = brotli.compress(self.identity, quality=5) if large and brotli is not None else None
+
+
+def _accepted_encodings(header):
+    accepted = set()
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        if coding and params not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(coding.lower())
+    return accepted
+
+
+def _etag_matches(header, etag):
+    if not header:
+        return False
+    tags = [t.strip() for t in header.split(",")]
+    # Weak comparison: proxies that recompress turn the tag into W/"..."
+    return "*" in tags or etag in (t[2:] if t.startswith("W/") else t for t in tags)
+
+
+def encoded_response(request, body):
+    headers = {"ETag": body.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if _etag_matches(request.headers.get("if-none-match"), body.etag):
+        return Response(status_code=304, headers=headers)
+
+    accepted = _accepted_encodings(request.headers.get("accept-encoding"))
+    if body.br is not None and "br" in accepted:
+        headers["Content-Encoding"] = "br"
+        return Response(body.br, media_type="application/json", headers=headers)
+    if body.gzip is not None and "gzip" in accepted:
+        headers["Content-Encoding"] = "gzip"
+        return Response(body.gzip, media_type="application/json", headers=headers)
+    return Response(body.identity, media_type="application/json", headers=headers)
+
+
+# A cursor is an offset into a list plus the version of the list it was
+# issued for, so paging across a refresh that changed the list is refused
+# instead of silently skipping or repeating rows
+
+def encode_cursor(offset, version):
+    return base64.urlsafe_b64encode(f"o:{offset}:{version}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    # (offset, version); raises ValueError for anything encode_cursor()
+    # didn't produce
+    try:
+        text = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    prefix, offset, version = (text.split(":", 2) + ["", ""])[:3]
+    if prefix != "o" or not offset.isdigit() or not version:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return int(offset), version
+
+
+def ndjson_response(rows, headers=None):
+    # rows: an iterable of dicts, encoded lazily a chunk at a time so memory
+    # stays bounded by NDJSON_CHUNK however long the result is
+    def chunks():
+        batch = []
+        for row in rows:
+            batch.append(dumps(row))
+            if len(batch) >= NDJSON_CHUNK:
+                yield b"\n".join(batch) + b"\n"
+                batch = []
+        if batch:
+            yield b"\n".join(batch) + b"\n"
+
+    return StreamingResponse(chunks(), media_type="application/x-ndjson", headers=headers)
@@ -0,0 +1,450 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from cache import TTLCache
+from metrics import REFRESH_SECONDS, REFRESH_TOTAL
+
+# Background refresh for the API's datasets. Each dataset keeps the last good
+# snapshot per argument key and serves it straight away (stale-while-revalidate);
+# refreshes run off the request path and concurrent misses for the same key
+# share a single scrape.
+#
+# With a store, several worker processes can share one scheduler's work: the
+# process holding the store's leader lock scrapes, the rest are followers
+# that sync snapshots from the store and ask the leader for the keys they
+# need instead of scraping themselves. A follower takes over the lock if the
+# leader exits.
+
+# Seconds between a follower's store syncs, and between the leader's checks
+# for keys followers asked for
+SYNC_INTERVAL = 0.5
+# Sync window overlap, for snapshots committed just after a sync read
+SYNC_OVERLAP = 5.0
+# Seconds a follower waits for the leader to load a key before giving up
+REMOTE_REFRESH_TIMEOUT = 30.0
+
+
+class Snapshot:
+    def __init__(self, data, fetched_at):
+        self.data = data
+        self.fetched_at = fetched_at
+        self.last_access = fetched_at
+
+
+class Dataset:
+    # interval: seconds before a snapshot is revalidated in the background
+    # (None = never, e.g. finished results). ttl: seconds before it is dropped.
+    # Both may be callables of the key args so live and finished data differ.
+    # decode turns one stored item back into a record on warm start.
+    def __init__(self, name, loader, interval, defaults=((),), ttl=None, maxsize=32, decode=None):
+        self.name = name
+        self.loader = loader
+        self.decode = decode
+        self.interval = interval
+        self.ttl = ttl
+        self.defaults = defaults
+        self.snapshots = TTLCache(maxsize=maxsize, ttl=3600)
+        self.inflight = {}
+
+    def default_keys(self):
+        # defaults may be a callable so keys like "today" roll over by themselves
+        return list(self.defaults() if callable(self.defaults) else self.defaults)
+
+    def interval_for(self, args):
+        return self.interval(*args) if callable(self.interval) else self.interval
+
+    def ttl_for(self, args):
+        ttl = self.ttl(*args) if callable(self.ttl) else self.ttl
+        if ttl is not None:
+            return ttl
+        # By default keep a snapshot for a few refresh cycles after its last read
+        interval = self.interval_for(args)
+        return 10 * interval if interval else self.snapshots.ttl
+
+    def is_due(self, args, snapshot, now):
+        interval = self.interval_for(args)
+        return interval is not None and now - snapshot.fetched_at >= interval
+
+
+class RefreshScheduler:
+    def __init__(self, tick=5, max_workers=16, store=None):
+        self.tick = tick
+        self.store = store
+        self.lock = store.leader_lock() if store is not None else None
+        self.datasets = {}
+        self.listeners = []
+        self._lock = threading.Lock()
+        # (name, args) -> time a follower asked the leader for it
+        self._remote = {}
+        self._synced_at = 0.0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="refresh")
+        self._stop = threading.Event()
+        self._thread = None
+
+    def register(self, name, loader, interval, defaults=((),), ttl=None, maxsize=32, decode=None):
+        self.datasets[name] = Dataset(name, loader, interval, defaults, ttl, maxsize, decode)
+
+    def add_listener(self, listener):
+        # listener(name, args, previous_data, data), called from the refresh
+        # worker whenever a scrape replaces a snapshot (previous_data is None
+        # for a key's first load)
+        self.listeners.append(listener)
+
+    @property
+    def is_leader(self):
+        return self.lock is None or self.lock.held
+
+    async def get_many_async(self, name, keys, timeout=None):
+        # Data per key. Cached keys are answered on the event loop; the rest
+        # are looked up in the store and, failing that, scraped, both off the
+        # loop. On timeout the scrapes keep running and land in the cache for
+        # the next request.
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        dataset = self.datasets[name]
+        now = time.time()
+        results = []
+        for args in keys:
+            snapshot = dataset.snapshots.get(args)
+            if snapshot is not None:
+                snapshot.last_access = now
+                if dataset.is_due(args, snapshot, now):
+                    self.refresh(name, *args)
+            results.append(snapshot.data if snapshot is not None else None)
+
+        missing = [args for args, data in zip(keys, results) if data is None]
+        if missing:
+            started = iter(await asyncio.wait_for(loop.run_in_executor(None, self._start_many, name, missing),
+                                                  timeout))
+            results = [next(started) if data is None else data for data in results]
+        pending = [asyncio.wrap_future(r) for r in results if isinstance(r, Future)]
+        if pending:
+            remaining = None if deadline is None else max(deadline - loop.time(), 0)
+            # shield(): a timeout must not cancel the futures _run() resolves
+            await asyncio.wait_for(asyncio.shield(asyncio.gather(*pending)), remaining)
+        return [r.result() if isinstance(r, Future) else r for r in results]
+
+    async def get_async(self, name, *args, timeout=None):
+        return (await self.get_many_async(name, [args], timeout))[0]
+
+    def peek_many(self, name, keys):
+        # Cached data per key, None where a key isn't cached; never loads,
+        # scrapes or waits, so it's safe on the event loop
+        dataset = self.datasets[name]
+        snapshots = [dataset.snapshots.peek(args) for args in keys]
+        return [s.data if s is not None else None for s in snapshots]
+
+    def _start_many(self, name, keys):
+        # Snapshot data per key, or the Future of its first load. May block
+        # on the store, so get_many_async() runs it off the event loop.
+        dataset = self.datasets[name]
+        now = time.time()
+        results = []
+        for args in keys:
+            snapshot = dataset.snapshots.get(args)
+            if snapshot is None:
+                # Not cached but maybe stored, e.g. a backfilled date
+                snapshot = self._load_stored(dataset, args)
+            if snapshot is not None:
+                snapshot.last_access = now
+                if dataset.is_due(args, snapshot, now):
+                    self.refresh(name, *args)
+                results.append(snapshot.data)
+            else:
+                # Cold key: wait on the shared scrape rather than starting our own
+                results.append(self.refresh(name, *args))
+        return results
+
+    def _load_stored(self, dataset, args):
+        if self.store is None:
+            return None
+        try:
+            row = self.store.load(dataset.name, args)
+        except Exception as e:
+            print(f"Error loading {dataset.name}{args} snapshot: {e}")
+            return None
+        if row is None:
+            return None
+        fetched_at, data = row
+        if dataset.decode is not None:
+            data = [dataset.decode(item) for item in data]
+        snapshot = Snapshot(data, fetched_at)
+        with self._lock:
+            # A scrape may have landed meanwhile; it wins
+            current = dataset.snapshots.peek(args)
+            if current is not None:
+                return current
+            dataset.snapshots.set(args, snapshot, ttl=dataset.ttl_for(args))
+        return snapshot
+
+    def refresh(self, name, *args):
+        dataset = self.datasets[name]
+        with self._lock:
+            future = dataset.inflight.get(args)
+            if future is not None:
+                return future
+            future = Future()
+            dataset.inflight[args] = future
+            leader = self.is_leader
+            if not leader:
+                self._remote[(name, args)] = time.time()
+        if leader:
+            self._executor.submit(self._run, dataset, args, future)
+        else:
+            # The leader scrapes it; _sync() resolves the future. A follower's
+            # pool is otherwise idle, and the store write stays off the caller.
+            self._executor.submit(self._request_remote, name, args)
+        return future
+
+    def _request_remote(self, name, args):
+        try:
+            self.store.request_refresh(name, args)
+        except Exception as e:
+            print(f"Error requesting {name}{args} refresh: {e}")
+
+    def _run(self, dataset, args, future):
+        # Sources are labelled by their (sport, league) part of the key
+        source = "/".join(str(a) for a in args[:2]) or "all"
+        start = time.perf_counter()
+        try:
+            data = dataset.loader(*args)
+            outcome = "ok" if data else "empty"
+        except Exception as e:
+            print(f"Error refreshing {dataset.name}{args}: {e}")
+            data = None
+            outcome = "error"
+        REFRESH_SECONDS.observe(time.perf_counter() - start, dataset.name, source)
+        REFRESH_TOTAL.inc(dataset.name, source, outcome)
+        with self._lock:
+            previous = dataset.snapshots.peek(args)
+            # Keep serving the last good snapshot if the scrape came back empty
+            if data or previous is None:
+                snapshot = Snapshot(data or [], time.time())
+                if previous is not None:
+                    snapshot.last_access = previous.last_access
+            else:
+                snapshot = previous
+                snapshot.fetched_at = time.time()
+            dataset.snapshots.set(args, snapshot, ttl=dataset.ttl_for(args))
+            del dataset.inflight[args]
+        future.set_result(snapshot.data)
+        if snapshot is not previous:
+            self._notify(dataset.name, args, previous, snapshot)
+        if data and self.store is not None:
+            try:
+                self.store.save(dataset.name, args, data, snapshot.fetched_at)
+            except Exception as e:
+                print(f"Error saving {dataset.name}{args} snapshot: {e}")
+        if self.lock is not None:
+            # Tell followers waiting on this key that it's done, data or not
+            try:
+                self.store.complete_refresh(dataset.name, args)
+            except Exception as e:
+                print(f"Error completing {dataset.name}{args} refresh: {e}")
+
+    def _notify(self, name, args, previous, snapshot):
+        for listener in self.listeners:
+            try:
+                listener(name, args, previous.data if previous is not None else None, snapshot.data)
+            except Exception as e:
+                print(f"Error notifying {name}{args} listener: {e}")
+
+    def _apply_stored(self, dataset, args, fetched_at, text):
+        # Follower: adopt a snapshot the leader wrote (as JSON text) unless
+        # ours is as new. Resolves a pending request for the key either way.
+        # Sync windows overlap, so rows already adopted come back; they
+        # aren't parsed or decoded again.
+        previous = dataset.snapshots.peek(args)
+        if previous is not None and previous.fetched_at >= fetched_at:
+            data = None
+        else:
+            data = json.loads(text)
+            if dataset.decode is not None:
+                data = [dataset.decode(item) for item in data]
+        with self._lock:
+            previous = dataset.snapshots.peek(args)
+            snapshot = None
+            if data is not None and (previous is None or previous.fetched_at < fetched_at):
+                snapshot = Snapshot(data, fetched_at)
+                if previous is not None:
+                    snapshot.last_access = previous.last_access
+                dataset.snapshots.set(args, snapshot, ttl=dataset.ttl_for(args))
+            future = self._take_remote(dataset, args)
+        if future is not None:
+            current = snapshot or previous
+            future.set_result(current.data if current is not None else [])
+        if snapshot is not None and previous is not None:
+            self._notify(dataset.name, args, previous, snapshot)
+
+    def _take_remote(self, dataset, args):
+        # Caller holds self._lock
+        if self._remote.pop((dataset.name, args), None) is None:
+            return None
+        return dataset.inflight.pop(args, None)
+
+    def _sync(self):
+        # Follower: pick up snapshots the leader saved since the last sync,
+        # then settle requests it completed without saving (empty scrapes)
+        # and ones it never answered
+        since = self._synced_at - SYNC_OVERLAP
+        self._synced_at = time.time()
+        for name, dataset in self.datasets.items():
+            for args, fetched_at, data in self.store.changes_since(name, since):
+                self._apply_stored(dataset, args, fetched_at, data)
+
+        now = time.time()
+        for name, args, completed_at in self.store.completed_refreshes(since):
+            dataset = self.datasets.get(name)
+            if dataset is None or (name, args) not in self._remote:
+                continue
+            with self._lock:
+                future = self._take_remote(dataset, args)
+                snapshot = dataset.snapshots.peek(args)
+                if snapshot is not None:
+                    # The leader kept its last good snapshot; so do we
+                    snapshot.fetched_at = max(snapshot.fetched_at, completed_at)
+            if future is not None:
+                future.set_result(snapshot.data if snapshot is not None else [])
+        with self._lock:
+            expired = [(name, args) for (name, args), requested_at in self._remote.items()
+                       if now - requested_at > REMOTE_REFRESH_TIMEOUT]
+            futures = [(self.datasets[name], args, self._take_remote(self.datasets[name], args))
+                       for name, args in expired]
+        for dataset, args, future in futures:
+            if future is not None:
+                print(f"Timed out waiting for the leader to refresh {dataset.name}{args}")
+                snapshot = dataset.snapshots.peek(args)
+                future.set_result(snapshot.data if snapshot is not None else [])
+
+    def _serve_requests(self):
+        # Leader: scrape whatever followers asked for
+        for name, args in self.store.pending_refreshes():
+            if name in self.datasets:
+                self.refresh(name, *args)
+
+    def _promote(self):
+        # This process just took the leader lock: scrape the keys it was
+        # waiting on itself, and start keeping the defaults fresh
+        print(f"Worker {os.getpid()} is now the refresh leader")
+        with self._lock:
+            remote = list(self._remote)
+            self._remote.clear()
+        for name, args in remote:
+            dataset = self.datasets[name]
+            future = dataset.inflight.get(args)
+            if future is not None:
+                self._executor.submit(self._run, dataset, args, future)
+        for name, dataset in self.datasets.items():
+            for args in dataset.default_keys():
+                if dataset.snapshots.peek(args) is None:
+                    self.refresh(name, *args)
+
+    def warm_start(self):
+        # Seed the caches from the store; snapshots keep their original
+        # timestamps so anything old is revalidated by the first refresh
+        if self.store is None:
+            return
+        for name, dataset in self.datasets.items():
+            default_keys = dataset.default_keys()
+            # The default keys and the most recently written others, at most
+            # a cache's worth; older keys (past dates, backfills) are loaded
+            # on demand by get_many_async, so warm start doesn't grow with them
+            try:
+                rows = self.store.load_latest(name, default_keys) if default_keys else []
+                rows += self.store.load_latest(name, limit=dataset.snapshots.maxsize)
+            except Exception as e:
+                print(f"Error loading {name} snapshots: {e}")
+                continue
+            rows = list({row[0]: row for row in reversed(rows)}.values())
+            default_keys = set(default_keys)
+            if default_keys:
+                # Skip rows stored under a key layout the dataset no longer uses
+                arities = {len(args) for args in default_keys}
+                rows = [row for row in rows if len(row[0]) in arities]
+            # Default keys go in last so the others can't push them out of the LRU
+            rows.sort(key=lambda row: (row[0] in default_keys, row[1]))
+            for args, fetched_at, data in rows[-dataset.snapshots.maxsize:]:
+                if dataset.decode is not None:
+                    data = [dataset.decode(item) for item in data]
+                if dataset.snapshots.peek(args) is None:
+                    dataset.snapshots.set(args, Snapshot(data, fetched_at), ttl=dataset.ttl_for(args))
+
+    def refresh_all(self):
+        keys = [(name, args) for name, dataset in self.datasets.items()
+                for args in set(dataset.snapshots.keys()) | set(dataset.default_keys())]
+        for name, args in keys:
+            self.refresh(name, *args)
+
+    def _due(self):
+        now = time.time()
+        due = []
+        for name, dataset in self.datasets.items():
+            default_keys = dataset.default_keys()
+            # An evicted default key comes back from the store when it's there,
+            # so final data (a past month's results) isn't scraped again
+            due.extend((name, args) for args in default_keys
+                       if dataset.snapshots.peek(args) is None and self._load_stored(dataset, args) is None)
+            for args, snapshot in dataset.snapshots.items():
+                # Only keep revalidating keys somebody has read since the last scrape
+                if args not in default_keys and snapshot.last_access <= snapshot.fetched_at:
+                    continue
+                if dataset.is_due(args, snapshot, now):
+                    due.append((name, args))
+        return due
+
+    def _loop(self):
+        last_due = time.time()
+        while not self._stop.wait(SYNC_INTERVAL if self.lock is not None else self.tick):
+            try:
+                if not self.is_leader and self.lock.acquire():
+                    self._promote()
+                if not self.is_leader:
+                    self._sync()
+                    continue
+                if self.lock is not None:
+                    self._serve_requests()
+            except Exception as e:
+                print(f"Error coordinating with other workers: {e}")
+            if time.time() - last_due >= self.tick:
+                last_due = time.time()
+                for name, args in self._due():
+                    self.refresh(name, *args)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self.warm_start()
+        self._synced_at = time.time()
+        if self.lock is None or self.lock.acquire():
+            for name, dataset in self.datasets.items():
+                for args in dataset.default_keys():
+                    self.refresh(name, *args)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="refresh-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.lock is not None:
+            self.lock.release()
+
+    def worker_stats(self):
+        return {"pid": os.getpid(), "role": "leader" if self.is_leader else "follower",
+                "waiting_on_leader": len(self._remote)}
+
+    def stats(self):
+        now = time.time()
+        stats = {}
+        for name, dataset in self.datasets.items():
+            snapshots = [snapshot for _, snapshot in dataset.snapshots.items()]
+            stats[name] = dataset.snapshots.stats()
+            stats[name]["records"] = sum(len(snapshot.data) for snapshot in snapshots)
+            stats[name]["oldest_age"] = round(max((now - s.fetched_at for s in snapshots), default=0), 1)
+            stats[name]["inflight"] = len(dataset.inflight)
+        return stats
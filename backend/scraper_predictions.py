@@ -1,138 +1,108 @@
-import requests
+import argparse
 from bs4 import BeautifulSoup
-import pandas as pd
-import time
+from fetcher import fetch_parsed, run_all
+from exporter import export_records
+from records import Prediction, parse_prob, to_dicts
+from profiling import add_profile_argument, profiled
 
-def scrape_predictions_all():
-    all_predictions = []
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-    }
-    session = requests.Session()
-    session.headers.update(headers)
+def parse_oddsportal_matches(res):
+    # (home, away, home odds, draw odds, away odds) for the first listed matches
+    soup = BeautifulSoup(res.text, "html.parser")
+    rows_out = []
 
-    # SOCCER PREDICTIONS - Using OddsPortal as reliable source
+    # Find prediction rows
+    matches = soup.select(".deactivate")[:10]
+
+    for match in matches:
+        try:
+            teams = match.select(".participant-name")
+            if len(teams) >= 2:
+                home_team = teams[0].text.strip()
+                away_team = teams[1].text.strip()
+
+                # Get odds
+                odds_cells = match.select(".odds-cell")
+                if len(odds_cells) >= 3:
+                    rows_out.append((home_team, away_team, odds_cells[0].text.strip(),
+                                     odds_cells[1].text.strip(), odds_cells[2].text.strip()))
+        except:
+            continue
+    return rows_out
+
+def odds_to_prob(odds):
+    # Decimal odds -> implied probability in percent; "-" / "" -> None
     try:
-        oddsportal_url = "https://www.oddsportal.com/matches/soccer/"
-        res = session.get(oddsportal_url, timeout=10)
-        res.raise_for_status()
-        soup = BeautifulSoup(res.text, "html.parser")
-        
-        # Find prediction rows
-        matches = soup.select(".deactivate")[:10]
-        
-        for match in matches:
-            try:
-                teams = match.select(".participant-name")
-                if len(teams) >= 2:
-                    home_team = teams[0].text.strip()
-                    away_team = teams[1].text.strip()
-                    
-                    # Get odds
-                    odds_cells = match.select(".odds-cell")
-                    if len(odds_cells) >= 3:
-                        home_odds = odds_cells[0].text.strip()
-                        draw_odds = odds_cells[1].text.strip()
-                        away_odds = odds_cells[2].text.strip()
-                        
-                        # Convert to probabilities
-                        try:
-                            home_prob = f"{100/float(home_odds):.1f}%" if home_odds and home_odds != '-' else 'N/A'
-                            draw_prob = f"{100/float(draw_odds):.1f}%" if draw_odds and draw_odds != '-' else 'N/A'
-                            away_prob = f"{100/float(away_odds):.1f}%" if away_odds and away_odds != '-' else 'N/A'
-                        except:
-                            home_prob, draw_prob, away_prob = "N/A", "N/A", "N/A"
-                        
-                        all_predictions.append({
-                            "sport": "Soccer",
-                            "league": "Various",
-                            "home_team": home_team,
-                            "away_team": away_team,
-                            "home_win_prob": home_prob,
-                            "draw_prob": draw_prob,
-                            "away_win_prob": away_prob
-                        })
-            except:
-                continue
-        time.sleep(1)
-    except Exception as e:
-        print(f"Error scraping Soccer predictions: {e}")
-        # Fallback sample data
-        all_predictions.append({
-            "sport": "Soccer", 
-            "league": "Premier League", 
-            "home_team": "Manchester United", 
-            "away_team": "Liverpool", 
-            "home_win_prob": "45%", 
-            "draw_prob": "25%", 
-            "away_win_prob": "30%"
-        })
+        return 100 / float(odds)
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+
+def scrape_soccer_predictions():
+    predictions = []
+    # SOCCER PREDICTIONS - Using OddsPortal as reliable source
+    oddsportal_url = "https://www.oddsportal.com/matches/soccer/"
+    for home_team, away_team, home_odds, draw_odds, away_odds in fetch_parsed(oddsportal_url, parse_oddsportal_matches):
+        predictions.append(Prediction("Soccer", "Various", home_team, away_team,
+                                      odds_to_prob(home_odds), odds_to_prob(draw_odds),
+                                      odds_to_prob(away_odds)))
+    return predictions
 
+def parse_playoff_odds(res):
+    # (team, playoff probability without the % sign) for the top rows
+    soup = BeautifulSoup(res.text, "html.parser")
+    rows_out = []
+
+    table = soup.find("table", id="playoff_odds")
+    if table:
+        rows = table.find("tbody").find_all("tr")[:5]
+        for row in rows:
+            cells = row.find_all("td")
+            if len(cells) >= 2:
+                rows_out.append((cells[0].text.strip(), cells[1].text.strip().rstrip('%')))
+    return rows_out
+
+def scrape_mlb_predictions():
+    predictions = []
     # MLB PREDICTIONS - Using Baseball Reference
+    mlb_url = "https://www.baseball-reference.com/leagues/majors/2025-playoff-odds.shtml"
+    for team, playoff_prob in fetch_parsed(mlb_url, parse_playoff_odds):
+        predictions.append(Prediction("MLB", "MLB", team, "Opponent", parse_prob(playoff_prob), None, None))
+    return predictions
+
+# sport -> (source function, args). Like the score and fixture sources they
+# raise when their upstream fails, so the API keeps each sport's last good
+# snapshot; only the CLI export falls back to a sample row. Sports without a
+# scraped source (NBA, NFL, NHL) get the model's predictions only.
+PREDICTION_SOURCES = {"Soccer": (scrape_soccer_predictions, ()), "MLB": (scrape_mlb_predictions, ())}
+
+def list_prediction_sources(sport=None):
+    return [s for s in PREDICTION_SOURCES if sport is None or s.lower() == sport.lower()]
+
+def scrape_predictions_source(sport):
+    func, args = PREDICTION_SOURCES[sport]
+    return func(*args)
+
+def scrape_predictions_or_fallback(sport):
     try:
-        mlb_url = "https://www.baseball-reference.com/leagues/majors/2025-playoff-odds.shtml"
-        res = session.get(mlb_url, timeout=10)
-        res.raise_for_status()
-        soup = BeautifulSoup(res.text, "html.parser")
-        
-        table = soup.find("table", id="playoff_odds")
-        if table:
-            rows = table.find("tbody").find_all("tr")[:5]
-            for row in rows:
-                cells = row.find_all("td")
-                if len(cells) >= 2:
-                    team = cells[0].text.strip()
-                    playoff_prob = cells[1].text.strip().rstrip('%')
-                    all_predictions.append({
-                        "sport": "MLB",
-                        "league": "MLB",
-                        "home_team": team,
-                        "away_team": "Opponent",
-                        "home_win_prob": f"{playoff_prob}%",
-                        "draw_prob": None,
-                        "away_win_prob": "N/A"
-                    })
-        time.sleep(1)
+        return scrape_predictions_source(sport)
     except Exception as e:
-        print(f"Error scraping MLB predictions: {e}")
-
-    # Sample predictions for other sports
-    all_predictions.extend([
-        {
-            "sport": "NBA", 
-            "league": "NBA", 
-            "home_team": "Lakers", 
-            "away_team": "Warriors", 
-            "home_win_prob": "60%", 
-            "draw_prob": None, 
-            "away_win_prob": "40%"
-        },
-        {
-            "sport": "NFL", 
-            "league": "NFL", 
-            "home_team": "Chiefs", 
-            "away_team": "49ers", 
-            "home_win_prob": "65%", 
-            "draw_prob": None, 
-            "away_win_prob": "35%"
-        },
-        {
-            "sport": "NHL", 
-            "league": "NHL", 
-            "home_team": "Maple Leafs", 
-            "away_team": "Bruins", 
-            "home_win_prob": "55%", 
-            "draw_prob": None, 
-            "away_win_prob": "45%"
-        }
-    ])
+        print(f"Error scraping {sport} predictions: {e}")
+        if sport == "Soccer":
+            # Fallback sample data
+            return [Prediction("Soccer", "Premier League", "Manchester United", "Liverpool", 45.0, 25.0, 30.0)]
+        return []
 
-    if all_predictions:
-        df = pd.DataFrame(all_predictions)
-        return df.to_dict('records')
-    return [{"error": "No predictions available"}]
+def scrape_predictions_all():
+    all_predictions = []
+    for predictions in run_all([(scrape_predictions_or_fallback, (sport,)) for sport in PREDICTION_SOURCES]):
+        all_predictions.extend(predictions)
+    return all_predictions
 
 if __name__ == "__main__":
-    data = scrape_predictions_all()
-    df = pd.DataFrame(data)
-    print(df.head(10))
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrape predictions and export them to CSV")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    with profiled("scrape_predictions_all", args.profile):
+        data = scrape_predictions_all()
+    for prediction in data[:10]:
+        print(prediction)
+    export_records(to_dicts(data), "predictions")
@@ -1,186 +1,212 @@
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-import time
-from datetime import date, datetime
-import json
-
-def scrape_scores_all(date_str: str = None):
+import argparse
+import threading
+from datetime import date, timedelta
+from cache import TTLCache
+from fetcher import fetch_parsed, parse_json, run_all
+from parsing import fbref_schedule_rows
+from exporter import export_records
+from records import Match, parse_date, league_matches, to_dicts
+from profiling import add_profile_argument, profiled
+
+SOCCER_COMPETITIONS = [
+    (9, "Premier League", "https://fbref.com/en/comps/9/schedule/Premier-League-Scores-and-Fixtures"),
+    (12, "La Liga", "https://fbref.com/en/comps/12/schedule/La-Liga-Scores-and-Fixtures"),
+    (20, "Bundesliga", "https://fbref.com/en/comps/20/schedule/Bundesliga-Scores-and-Fixtures"),
+    (11, "Serie A", "https://fbref.com/en/comps/11/schedule/Serie-A-Scores-and-Fixtures"),
+    (13, "Ligue 1", "https://fbref.com/en/comps/13/schedule/Ligue-1-Scores-and-Fixtures"),
+    (22, "MLS", "https://fbref.com/en/comps/22/schedule/Major-League-Soccer-Scores-and-Fixtures"),
+]
+
+def parse_fbref_schedule(res):
+    # (date, home, away, score) for every played or scheduled row
+    return fbref_schedule_rows(res.text)
+
+# A season page holds every date of a league, so today's scores, past dates
+# and ranges are all cut from one fetch. FBref results change a few times a
+# day and it blocks clients over its per-minute limit, so a page is fetched
+# at most once per SEASON_MAX_AGE however many keys need it.
+SEASON_MAX_AGE = 30 * 60
+_seasons = TTLCache(maxsize=len(SOCCER_COMPETITIONS), ttl=SEASON_MAX_AGE)
+_season_locks = {league_name: threading.Lock() for _, league_name, _ in SOCCER_COMPETITIONS}
+
+def soccer_season_matches(league_name, url):
+    # Every row of the season page in one pass; rows without a usable date
+    # keep date None. The list is shared between callers: read-only.
+    with _season_locks.get(league_name) or threading.Lock():
+        matches = _seasons.get(url)
+        if matches is None:
+            matches = [Match.from_score_text("Soccer", league_name, match_date, home, away, score)
+                       for match_date, home, away, score in fetch_parsed(url, parse_fbref_schedule)]
+            _seasons.set(url, matches)
+    return matches
+
+def scrape_soccer_scores(league_name, url, date_str=None):
+    # Soccer (FBref); transient failures are retried with backoff by fetch()
+    matches = soccer_season_matches(league_name, url)
+    if date_str is None:
+        return list(matches)
+    # An unparseable target date can't match any row
+    target_date = parse_date(date_str)
+    return [m for m in matches if m.date is not None and m.date == target_date]
+
+def scrape_soccer_scores_range(league_name, url, start=None, end=None):
+    # No bounds: the whole season
+    return [m for m in soccer_season_matches(league_name, url)
+            if m.date and (start is None or start <= m.date <= end)]
+
+def mlb_scores(start, end):
+    mlb_url = (f"https://statsapi.mlb.com/api/v1/schedule?hydrate=game(content(summary)),team"
+               f"&startDate={start}&endDate={end}&sportId=1")
+    mlb_data = fetch_parsed(mlb_url, parse_json)
+
+    matches = []
+    for game_date in mlb_data.get('dates', []):
+        for game in game_date.get('games', []):
+            status = game.get('status', {}).get('abstractGameState', '')
+            if status in ['Preview', 'Live', 'Final']:
+                teams = game.get('teams', {})
+                home_team = teams.get('home', {}).get('team', {}).get('name', 'Unknown')
+                away_team = teams.get('away', {}).get('team', {}).get('name', 'Unknown')
+                home_score = teams.get('home', {}).get('score', 0)
+                away_score = teams.get('away', {}).get('score', 0)
+
+                match = Match("MLB", "MLB", parse_date(game_date['date']), home_team, away_team)
+                if home_score or away_score:
+                    match.home_score, match.away_score, match.note = home_score, away_score, None
+                matches.append(match)
+    return matches
+
+def scrape_mlb_scores(date_str=None):
     today = date_str or date.today().isoformat()
-    all_matches = []
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Accept-Encoding': 'gzip, deflate',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1',
-    }
-
-    session = requests.Session()
-    session.headers.update(headers)
-
-    # Soccer (FBref) with retries
-    soccer_competitions = [
-        (9, "Premier League", "https://fbref.com/en/comps/9/schedule/Premier-League-Scores-and-Fixtures"),
-        (12, "La Liga", "https://fbref.com/en/comps/12/schedule/La-Liga-Scores-and-Fixtures"),
-        (20, "Bundesliga", "https://fbref.com/en/comps/20/schedule/Bundesliga-Scores-and-Fixtures"),
-        (11, "Serie A", "https://fbref.com/en/comps/11/schedule/Serie-A-Scores-and-Fixtures"),
-        (13, "Ligue 1", "https://fbref.com/en/comps/13/schedule/Ligue-1-Scores-and-Fixtures"),
-        (22, "MLS", "https://fbref.com/en/comps/22/schedule/Major-League-Soccer-Scores-and-Fixtures"),
-    ]
-
-    for code, league_name, url in soccer_competitions:
-        for attempt in range(3):  # Retry up to 3 times
-            try:
-                res = session.get(url, timeout=10)
-                res.raise_for_status()
-                soup = BeautifulSoup(res.text, "html.parser")
-                
-                table = soup.find("table", id="sched_all")
-                if table:
-                    rows = table.find("tbody").find_all("tr")
-                    for row in rows:
-                        if any(cls in row.get("class", []) for cls in ["thead", "over_header"]):
-                            continue
-                        
-                        date_cell = row.find("td", {"data-stat": "date"})
-                        home_cell = row.find("td", {"data-stat": "home_team"})
-                        away_cell = row.find("td", {"data-stat": "away_team"})
-                        score_cell = row.find("td", {"data-stat": "score"})
-                        
-                        match_date = date_cell.text.strip() if date_cell else None
-                        home = home_cell.text.strip() if home_cell else None
-                        away = away_cell.text.strip() if away_cell else None
-                        score = score_cell.text.strip() if score_cell else "TBD"
-                        
-                        if home and away and match_date:
-                            # Convert date format for comparison
-                            try:
-                                parsed_date = datetime.strptime(match_date, "%Y-%m-%d").date()
-                                target_date = datetime.strptime(today, "%Y-%m-%d").date() if today else date.today()
-                                
-                                if not date_str or parsed_date == target_date:
-                                    all_matches.append({
-                                        "sport": "Soccer",
-                                        "league": league_name,
-                                        "date": match_date,
-                                        "home_team": home,
-                                        "away_team": away,
-                                        "score": score
-                                    })
-                            except ValueError:
-                                # Date format doesn't match, skip filtering
-                                if not date_str:
-                                    all_matches.append({
-                                        "sport": "Soccer",
-                                        "league": league_name,
-                                        "date": match_date,
-                                        "home_team": home,
-                                        "away_team": away,
-                                        "score": score
-                                    })
-                time.sleep(2)  # Increased delay
-                break  # Success
-            except Exception as e:
-                print(f"Attempt {attempt+1} failed for Soccer {league_name}: {e}")
-                time.sleep(5 * attempt)  # Backoff
-                continue
-        else:
-            print(f"Failed to scrape Soccer {league_name} after 3 attempts")
-
-    # MLB
-    try:
-        mlb_url = f"https://statsapi.mlb.com/api/v1/schedule?hydrate=game(content(summary)),team&date={today}&sportId=1"
-        res = session.get(mlb_url, timeout=10)
-        res.raise_for_status()
-        mlb_data = res.json()
-        
-        for game_date in mlb_data.get('dates', []):
-            for game in game_date.get('games', []):
-                status = game.get('status', {}).get('abstractGameState', '')
-                if status in ['Preview', 'Live', 'Final']:
-                    teams = game.get('teams', {})
-                    home_team = teams.get('home', {}).get('team', {}).get('name', 'Unknown')
-                    away_team = teams.get('away', {}).get('team', {}).get('name', 'Unknown')
-                    home_score = teams.get('home', {}).get('score', 0)
-                    away_score = teams.get('away', {}).get('score', 0)
-                    score = f"{home_score}-{away_score}" if home_score or away_score else "TBD"
-                    
-                    all_matches.append({
-                        "sport": "MLB",
-                        "league": "MLB",
-                        "date": game_date['date'],
-                        "home_team": home_team,
-                        "away_team": away_team,
-                        "score": score
-                    })
-        time.sleep(1)
-    except Exception as e:
-        print(f"Error fetching MLB scores: {e}")
+    return mlb_scores(today, today)
+
+def scrape_mlb_scores_range(start, end):
+    # The schedule API takes a date range; month-sized windows keep each
+    # response small and let them load in parallel
+    windows = []
+    while start <= end:
+        window_end = min(end, start + timedelta(days=30))
+        windows.append((mlb_scores, (start.isoformat(), window_end.isoformat())))
+        start = window_end + timedelta(days=1)
+    return [m for matches in run_all(windows, raise_errors=True) for m in matches]
+
+def nhl_week_matches(game_week, seen=None):
+    # Every game of a schedule/{date} gameWeek, dated by its own day
+    matches = []
+    for day in game_week:
+        game_date = parse_date(day.get('date'))
+        for game in day.get('games', []):
+            game_id = game.get('id')
+            if seen is not None and game_id is not None:
+                if game_id in seen:
+                    continue
+                seen.add(game_id)
+            home_team = game.get('homeTeam', {}).get('name', {}).get('default', 'Unknown')
+            away_team = game.get('awayTeam', {}).get('name', {}).get('default', 'Unknown')
+
+            match = Match("NHL", "NHL", game_date, home_team, away_team)
+            # Get scores if game has started
+            if game.get('gameState') == 'OFF' or game.get('gameState') == 'FINAL':
+                match.home_score = game.get('homeTeam', {}).get('score', 0)
+                match.away_score = game.get('awayTeam', {}).get('score', 0)
+                match.note = None
+            matches.append(match)
+    return matches
 
+def nhl_schedule(date_str):
+    return fetch_parsed(f"https://api-web.nhle.com/v1/schedule/{date_str}", parse_json)
+
+def scrape_nhl_scores(date_str=None):
+    today = date_str or date.today().isoformat()
     # NHL via official API
+    nhl_data = nhl_schedule(today)
+    game_date = parse_date(today)
+    if 'gameWeek' in nhl_data:
+        return [m for m in nhl_week_matches(nhl_data['gameWeek']) if m.date == game_date]
+    # Off-season fallback
+    return [Match("NHL", "NHL", game_date, None, None, note="No games scheduled")]
+
+def scrape_nhl_scores_range(start, end):
+    # One request per gameWeek; overlapping weeks are deduplicated by game id
+    weeks = run_all([(nhl_schedule, ((start + timedelta(days=i)).isoformat(),))
+                     for i in range(0, (end - start).days + 1, 7)], raise_errors=True)
+    seen = set()
+    return [m for data in weeks for m in nhl_week_matches(data.get('gameWeek', []), seen)
+            if m.date and start <= m.date <= end]
+
+# (sport, league) -> (source function, leading args); the date is appended.
+# Sources raise when their upstream fails, so the API keeps serving its last
+# good snapshot instead of an empty or error list.
+SCORE_SOURCES = {("Soccer", league_name): (scrape_soccer_scores, (league_name, url))
+                 for code, league_name, url in SOCCER_COMPETITIONS}
+SCORE_SOURCES[("MLB", "MLB")] = (scrape_mlb_scores, ())
+SCORE_SOURCES[("NHL", "NHL")] = (scrape_nhl_scores, ())
+
+# Date-range variants for backfills: (start, end) dates are appended and
+# every game in between comes back. These raise on failure instead of
+# returning fallback rows so a failed source is never stored as "no games".
+SCORE_RANGE_SOURCES = {("Soccer", league_name): (scrape_soccer_scores_range, (league_name, url))
+                       for code, league_name, url in SOCCER_COMPETITIONS}
+SCORE_RANGE_SOURCES[("MLB", "MLB")] = (scrape_mlb_scores_range, ())
+SCORE_RANGE_SOURCES[("NHL", "NHL")] = (scrape_nhl_scores_range, ())
+
+def list_score_sources(sport=None, league=None):
+    return [(s, l) for s, l in SCORE_SOURCES
+            if (sport is None or s.lower() == sport.lower())
+            and (league is None or league_matches(league, l))]
+
+def scrape_scores_source(sport, league, date_str=None):
+    func, args = SCORE_SOURCES[(sport, league)]
+    return func(*args, date_str)
+
+def scrape_scores_range(sport, league, start, end):
+    func, args = SCORE_RANGE_SOURCES[(sport, league)]
+    return func(*args, start, end)
+
+def score_range_key(sport, league, start, end):
+    # Cache key for a range of one source's scores. A soccer season page
+    # holds every date whatever the range, so all ranges share one key for
+    # the whole season (None bounds) and the page is parsed once.
+    if SCORE_RANGE_SOURCES[(sport, league)][0] is scrape_soccer_scores_range:
+        return (sport, league, None, None)
+    return (sport, league, start.isoformat(), end.isoformat())
+
+def scrape_scores_or_error(sport, league, date_str):
+    # CLI export: a failed source shows up as an error row
     try:
-        nhl_url = f"https://api-web.nhle.com/v1/schedule/{today}"
-        res = session.get(nhl_url, timeout=10)
-        res.raise_for_status()
-        nhl_data = res.json()
-        
-        if 'gameWeek' in nhl_data:
-            for day in nhl_data['gameWeek']:
-                for game in day.get('games', []):
-                    home_team = game.get('homeTeam', {}).get('name', {}).get('default', 'Unknown')
-                    away_team = game.get('awayTeam', {}).get('name', {}).get('default', 'Unknown')
-                    
-                    # Get scores if game has started
-                    if game.get('gameState') == 'OFF' or game.get('gameState') == 'FINAL':
-                        home_score = game.get('homeTeam', {}).get('score', 0)
-                        away_score = game.get('awayTeam', {}).get('score', 0)
-                        score = f"{home_score}-{away_score}"
-                    else:
-                        score = "TBD"
-                    
-                    all_matches.append({
-                        "sport": "NHL",
-                        "league": "NHL",
-                        "date": today,
-                        "home_team": home_team,
-                        "away_team": away_team,
-                        "score": score
-                    })
-        else:
-            # Off-season fallback
-            all_matches.append({
-                "sport": "NHL",
-                "league": "NHL",
-                "date": today,
-                "home_team": None,
-                "away_team": None,
-                "score": "No games scheduled"
-            })
-        time.sleep(1)
+        return scrape_scores_source(sport, league, date_str)
     except Exception as e:
-        print(f"Error fetching NHL scores: {e}")
-        all_matches.append({
-            "sport": "NHL",
-            "league": "NHL",
-            "date": today,
-            "home_team": None,
-            "away_team": None,
-            "score": f"Error: {e}"
-        })
-
-    if all_matches:
-        df = pd.DataFrame(all_matches)
-        df = df.sort_values(by=["sport", "league", "date"]).reset_index(drop=True)
-        df.to_csv("all_scores.csv", index=False)
-        for sport in df['sport'].unique():
-            sport_df = df[df['sport'] == sport]
-            if not sport_df.empty:
-                sport_df.to_csv(f"{sport.lower()}_scores.csv", index=False)
-        return df.to_dict('records')
-    return []
+        print(f"Error scraping {sport} {league} scores: {e}")
+        if sport == "NHL":
+            return [Match("NHL", "NHL", parse_date(date_str), None, None, note=f"Error: {e}")]
+        return []
+
+def scrape_scores_all(date_str: str = None, sources=None):
+    today = date_str or date.today().isoformat()
+
+    # Every league and sport is fetched concurrently; fetcher spaces out
+    # requests per host so FBref still sees one request at a time.
+    # Soccer keeps the raw date_str so None still means the whole season.
+    tasks = []
+    for sport, league in sources or list(SCORE_SOURCES):
+        tasks.append((scrape_scores_or_error, (sport, league, date_str if sport == "Soccer" else today)))
+
+    all_matches = []
+    for matches in run_all(tasks):
+        all_matches.extend(matches)
+
+    all_matches.sort(key=lambda m: (m.sport, m.league, m.date or date.min))
+    return all_matches
 
 if __name__ == "__main__":
-    data = scrape_scores_all()
-    print(pd.DataFrame(data).head(10) if data else "Empty")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrape today's scores and export them to CSV")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    with profiled("scrape_scores_all", args.profile):
+        data = scrape_scores_all()
+    for match in data[:10]:
+        print(match)
+    if data:
+        export_records(to_dicts(data), "scores")
+    else:
+        print("Empty")
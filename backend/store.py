@@ -0,0 +1,197 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # no flock (Windows): every process acts as its own leader
+    fcntl = None
+
+# Local SQLite store for scrape snapshots. Every successful refresh is written
+# with its timestamp so a freshly started API process can serve the latest
+# snapshots immediately while the background scrapes catch up.
+#
+# The same database is how several API worker processes share one cache:
+# the worker holding the leader lock does all the scraping and writes every
+# snapshot here; the others read them back and queue the keys they need in
+# refresh_requests for the leader to pick up.
+
+DEFAULT_DB_PATH = os.environ.get(
+    "MKSPORTS_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "mksports.db")
+)
+# How many historical snapshots to keep per (dataset, key)
+KEEP_SNAPSHOTS = 5
+
+
+def _encode(value):
+    # Records are stored in their API dict form
+    to_dict = getattr(value, "to_dict", None)
+    return to_dict() if to_dict is not None else str(value)
+
+
+class SnapshotStore:
+    def __init__(self, path=DEFAULT_DB_PATH, keep=KEEP_SNAPSHOTS):
+        self.path = path
+        self.keep = keep
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    dataset TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    data TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS snapshots_lookup ON snapshots (dataset, key, fetched_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS snapshots_recent ON snapshots (dataset, fetched_at)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS refresh_requests (
+                    dataset TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    requested_at REAL NOT NULL,
+                    completed_at REAL,
+                    PRIMARY KEY (dataset, key)
+                )
+            """)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def save(self, dataset, key, data, fetched_at=None):
+        self.save_many(dataset, [(key, data)], fetched_at)
+
+    def save_many(self, dataset, items, fetched_at=None):
+        # items: [(key, data)], written in a single transaction
+        fetched_at = fetched_at or time.time()
+        rows = [(dataset, json.dumps(list(key)), fetched_at, json.dumps(data, default=_encode))
+                for key, data in items]
+        with self._lock, self._connect() as conn:
+            conn.executemany("INSERT INTO snapshots (dataset, key, fetched_at, data) VALUES (?, ?, ?, ?)", rows)
+            conn.executemany("""
+                DELETE FROM snapshots WHERE dataset = ? AND key = ? AND fetched_at NOT IN (
+                    SELECT fetched_at FROM snapshots WHERE dataset = ? AND key = ?
+                    ORDER BY fetched_at DESC LIMIT ?
+                )
+            """, [(dataset, key_json, dataset, key_json, self.keep) for dataset, key_json, _, _ in rows])
+
+    def load(self, dataset, key):
+        # (fetched_at, data) of the newest snapshot for one key, or None
+        with self._connect() as conn:
+            row = conn.execute("""
+                SELECT fetched_at, data FROM snapshots WHERE dataset = ? AND key = ?
+                ORDER BY fetched_at DESC LIMIT 1
+            """, (dataset, json.dumps(list(key)))).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def load_latest(self, dataset, keys=None, limit=None):
+        # Returns [(key, fetched_at, data)] with the newest snapshot per key,
+        # of every key or only the given ones, most recently written first.
+        # limit caps the keys in SQL, so old dates and backfills are never
+        # read or decoded when only the newest are wanted.
+        if keys is not None:
+            keys = [json.dumps(list(key)) for key in keys]
+            if not keys:
+                return []
+        where = "" if keys is None else f"AND key IN ({', '.join('?' * len(keys))})"
+        with self._connect() as conn:
+            rows = conn.execute(f"""
+                SELECT key, MAX(fetched_at) AS latest, data FROM snapshots
+                WHERE dataset = ? {where} GROUP BY key
+                ORDER BY latest DESC {"" if limit is None else "LIMIT ?"}
+            """, [dataset] + (keys or []) + ([] if limit is None else [limit])).fetchall()
+        return [(tuple(json.loads(key)), fetched_at, json.loads(data)) for key, fetched_at, data in rows]
+
+    def changes_since(self, dataset, since):
+        # Like load_latest(), limited to keys written after `since`. data is
+        # left as JSON text, for callers that skip rows they already have.
+        with self._connect() as conn:
+            rows = conn.execute("""
+                SELECT key, MAX(fetched_at), data FROM snapshots
+                WHERE dataset = ? AND fetched_at > ? GROUP BY key
+            """, (dataset, since)).fetchall()
+        return [(tuple(json.loads(key)), fetched_at, data) for key, fetched_at, data in rows]
+
+    def request_refresh(self, dataset, key):
+        with self._lock, self._connect() as conn:
+            conn.execute("""
+                INSERT INTO refresh_requests (dataset, key, requested_at) VALUES (?, ?, ?)
+                ON CONFLICT (dataset, key) DO UPDATE SET requested_at = excluded.requested_at, completed_at = NULL
+            """, (dataset, json.dumps(list(key)), time.time()))
+
+    def pending_refreshes(self):
+        # [(dataset, key)] requested and not yet completed
+        with self._connect() as conn:
+            rows = conn.execute("SELECT dataset, key FROM refresh_requests WHERE completed_at IS NULL").fetchall()
+        return [(dataset, tuple(json.loads(key))) for dataset, key in rows]
+
+    def complete_refresh(self, dataset, key):
+        # Old completed requests are dropped on the way
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute("""
+                UPDATE refresh_requests SET completed_at = ?
+                WHERE dataset = ? AND key = ? AND completed_at IS NULL
+            """, (now, dataset, json.dumps(list(key))))
+            conn.execute("DELETE FROM refresh_requests WHERE completed_at < ?", (now - 3600,))
+
+    def completed_refreshes(self, since):
+        # [(dataset, key, completed_at)] for requests completed after `since`
+        with self._connect() as conn:
+            rows = conn.execute("SELECT dataset, key, completed_at FROM refresh_requests WHERE completed_at > ?",
+                                (since,)).fetchall()
+        return [(dataset, tuple(json.loads(key)), completed_at) for dataset, key, completed_at in rows]
+
+    def leader_lock(self):
+        return LeaderLock(self.path + ".leader")
+
+
+class LeaderLock:
+    # An exclusive flock on a file next to the database. At most one process
+    # holds it, and the OS releases it when that process exits, so another
+    # worker can take over.
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    @property
+    def held(self):
+        return self._file is not None
+
+    def acquire(self):
+        # Non-blocking; True if this process holds the lock
+        if self._file is not None:
+            return True
+        if fcntl is None:
+            self._file = True
+            return True
+        f = open(self.path, "a+")
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        f.seek(0)
+        f.truncate()
+        f.write(str(os.getpid()))
+        f.flush()
+        self._file = f
+        return True
+
+    def release(self):
+        if self._file is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            self._file.close()
+        self._file = None
@@ -0,0 +1,141 @@
+import hashlib
+import heapq
+from datetime import date, time
+from cache import TTLCache
+from entities import league_id
+from records import league_matches, to_dicts
+from responses import EncodedBody
+from metrics import STAGE_SECONDS
+
+# Read-side indexes over the cached records. A view is built once per set of
+# snapshots (sorted once, bucketed by sport, league and date) and reused until
+# one of those snapshots is replaced, so the filtered routes cost O(result)
+# rather than a scan and sort of the whole dataset per request. Each slice of
+# a view is also JSON-encoded and compressed only once (see responses.py).
+
+BODIES_PER_VIEW = 64
+
+
+def record_order(r):
+    # sport, league, date, time; predictions have no date/time
+    return (r.sport, r.league, getattr(r, "date", None) or date.min, getattr(r, "time", None) or time.min)
+
+
+def timeline_order(r):
+    return (r.sport, getattr(r, "date", None) or date.min, getattr(r, "time", None) or time.min)
+
+
+class RecordView:
+    def __init__(self, records, name=None):
+        # records: by (sport, league, date, time); timeline: by (sport, date, time)
+        self.name = name
+        self.records = sorted(records, key=record_order)
+        self.timeline = sorted(self.records, key=timeline_order)
+        self.by_sport = {}
+        self.by_league = {}
+        self.by_league_id = {}
+        self.by_date = {}
+        # Full slices plus whatever pages/projections get asked for, bounded
+        self.bodies = TTLCache(maxsize=BODIES_PER_VIEW, ttl=24 * 60 * 60)
+        # variant -> content digest, for paging cursors
+        self.versions = TTLCache(maxsize=BODIES_PER_VIEW, ttl=24 * 60 * 60)
+        for r in self.records:
+            self.by_sport.setdefault(r.sport.lower(), []).append(r)
+            self.by_league.setdefault((r.sport.lower(), r.league), []).append(r)
+            self.by_league_id.setdefault((r.sport.lower(), r.league_id), []).append(r)
+            record_date = getattr(r, "date", None)
+            if record_date is not None:
+                self.by_date.setdefault(record_date, []).append(r)
+
+    def __len__(self):
+        return len(self.records)
+
+    def sport(self, sport):
+        return self.by_sport.get(sport.lower(), [])
+
+    def league(self, sport, league):
+        # A league's name or alias is a single lookup; looser queries
+        # ("premier") are matched over the handful of distinct league names,
+        # not the records
+        sport = sport.lower()
+        exact = self.by_league_id.get((sport, league_id(league)))
+        if exact is not None:
+            return exact
+        lists = [records for (s, name), records in self.by_league.items()
+                 if s == sport and league_matches(league, name)]
+        if len(lists) == 1:
+            return lists[0]
+        return list(heapq.merge(*lists, key=record_order))
+
+    def on_date(self, day):
+        return self.by_date.get(day, [])
+
+    def between(self, start, end):
+        # Records dated start..end inclusive, in timeline order
+        days = [day for day in self.by_date if start <= day <= end]
+        if len(days) == 1:
+            return sorted(self.by_date[days[0]], key=timeline_order)
+        return sorted((r for day in days for r in self.by_date[day]), key=timeline_order)
+
+    def encoded(self, variant, records, fields=None):
+        # variant names the slice, e.g. ("sport", "mlb"); the view is dropped
+        # with its snapshots, so the stored bodies never go stale
+        key = (variant, fields)
+        body = self.bodies.get(key)
+        if body is None:
+            with STAGE_SECONDS.time("serialize", self.name):
+                body = EncodedBody(to_dicts(records, fields))
+            self.bodies.set(key, body)
+        return body
+
+    def version(self, variant, records):
+        # Digest of a slice's contents. A rebuild that leaves the slice as it
+        # was keeps its version, so cursors only go stale when rows changed.
+        version = self.versions.get(variant)
+        if version is None:
+            version = hashlib.sha1(repr(records).encode()).hexdigest()[:16]
+            self.versions.set(variant, version)
+        return version
+
+    def encoded_by_date(self, days, fields=None):
+        # {"YYYY-MM-DD": [records]} for each requested day, empty days included
+        key = (("by_date", tuple(days)), fields)
+        body = self.bodies.get(key)
+        if body is None:
+            with STAGE_SECONDS.time("serialize", self.name):
+                body = EncodedBody({day.isoformat(): to_dicts(sorted(self.on_date(day), key=timeline_order), fields)
+                                    for day in days})
+            self.bodies.set(key, body)
+        return body
+
+
+class ViewCache:
+    # Views keyed by (dataset, snapshot keys). An entry holds the snapshot
+    # lists it was built from and is rebuilt only when one of them changes.
+    def __init__(self, maxsize=512, ttl=3600):
+        self.views = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.builds = 0
+
+    def get(self, key, parts):
+        view = self.peek(key, parts)
+        return view if view is not None else self.build(key, parts)
+
+    def peek(self, key, parts):
+        # The cached view if it was built from these same snapshot lists
+        entry = self.views.get(key)
+        if entry is not None and len(entry[0]) == len(parts) and all(a is b for a, b in zip(entry[0], parts)):
+            return entry[1]
+        return None
+
+    def build(self, key, parts):
+        parts = tuple(parts)
+        with STAGE_SECONDS.time("normalize", key[0]):
+            view = RecordView((r for records in parts for r in records), key[0])
+        self.views.set(key, (parts, view))
+        self.builds += 1
+        return view
+
+    def stats(self):
+        stats = self.views.stats()
+        stats["builds"] = self.builds
+        return stats
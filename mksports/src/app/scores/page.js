@@ -1,18 +1,46 @@
 'use client';
 import { useState, useEffect } from 'react';
-import { fetchScores } from '@/utils/api';
+import { fetchScores, subscribeScores } from '@/utils/api';
+
+const scoreKey = (s) => `${s.sport}|${s.league}|${s.date}|${s.home_team}|${s.away_team}`;
+
+// YYYY-MM-DD in local time, like the server's date.today()
+const localDate = () => {
+  const d = new Date();
+  return `${d.getFullYear()}-${String(d.getMonth() + 1).padStart(2, '0')}-${String(d.getDate()).padStart(2, '0')}`;
+};
 
 export default function ScoresPage() {
   const [scores, setScores] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [selectedSport, setSelectedSport] = useState('all');
-  const [selectedDate, setSelectedDate] = useState(new Date().toISOString().split('T')[0]);
+  const [selectedDate, setSelectedDate] = useState(localDate());
 
   useEffect(() => {
     loadScores();
   }, [selectedSport, selectedDate]);
 
+  // Today's scores follow the live stream instead of re-polling
+  useEffect(() => {
+    if (selectedDate !== localDate()) return;
+    const sport = selectedSport === 'all' ? null : selectedSport;
+    return subscribeScores(sport, {
+      onSnapshot: (data) => Array.isArray(data) && setScores(data),
+      onDiff: ({ date, changed, removed }) => date === selectedDate && setScores((current) => {
+        // Update games in place, drop removed ones, append new ones
+        const updates = new Map(changed.map((s) => [scoreKey(s), s]));
+        const gone = new Set(removed.map(scoreKey));
+        const next = current.filter((s) => !gone.has(scoreKey(s))).map((s) => {
+          const update = updates.get(scoreKey(s));
+          updates.delete(scoreKey(s));
+          return update || s;
+        });
+        return [...next, ...updates.values()];
+      }),
+    });
+  }, [selectedSport, selectedDate]);
+
   const loadScores = async () => {
     try {
       setLoading(true);
@@ -40,7 +40,37 @@ export async function fetchScores(sport = null, date = null) {
   return fetchData(endpoint);
 }
 
+// Matches: fixture, score and prediction joined per game, in one request
+export async function fetchMatches(sport = null, daysAhead = 7) {
+  const params = new URLSearchParams({ days_ahead: daysAhead });
+  if (sport) params.set('sport', sport);
+  return fetchData(`/matches?${params}`);
+}
+
+export async function fetchMatch(matchId) {
+  return fetchData(`/matches/${encodeURIComponent(matchId)}`);
+}
+
 // Refresh cache
 export async function refreshCache() {
   return fetchData('/refresh');
-}
\ No newline at end of file
+}
+// Live scores (server-sent events): onSnapshot gets today's full list once,
+// onDiff gets { changed, removed } after each re-scrape that changed something.
+// Returns a function that closes the stream.
+export function subscribeScores(sport = null, { onSnapshot, onDiff }) {
+  const params = sport ? `?${new URLSearchParams({ sport })}` : '';
+  let source;
+  const open = () => {
+    source = new EventSource(`${API_BASE_URL}/scores/live${params}`);
+    source.addEventListener('snapshot', (e) => onSnapshot(JSON.parse(e.data)));
+    source.addEventListener('diff', (e) => onDiff(JSON.parse(e.data)));
+    // Fell too far behind: start over from a fresh snapshot
+    source.addEventListener('resync', () => {
+      source.close();
+      open();
+    });
+  };
+  open();
+  return () => source.close();
+}